@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Optional
+
+from fastapi import Request
+
+from app.config import settings
+from app.services import metrics
+from app.services.rate_limiter import RateLimitDecision, rate_limiter
+
+# POST endpoints that start scraping work
+LIMITED_PATHS = ('/api/v1/analyze', '/api/v1/analyze/batch')
+# Responses for requests turned away before any work (invalid input, queue full) give the token back
+REFUNDED_STATUSES = {400, 413, 422, 503}
+API_KEYS = {key.strip() for key in settings.RATE_LIMIT_API_KEYS.split(',') if key.strip()}
+
+
+class RateLimitExceeded(Exception):
+    """A batch item could not get a token within RATE_LIMIT_BATCH_MAX_WAIT"""
+
+
+def client_key(scope) -> str:
+    """Bucket for a request: its API key if it is a known one, else the client IP"""
+    headers = dict(scope.get('headers') or [])
+    api_key = headers.get(b'x-api-key', b'').decode('latin-1').strip()
+    if api_key in API_KEYS:
+        return f"key:{hashlib.sha256(api_key.encode()).hexdigest()[:16]}"
+
+    if settings.RATE_LIMIT_TRUST_FORWARDED and b'x-forwarded-for' in headers:
+        return f"ip:{headers[b'x-forwarded-for'].decode('latin-1').split(',')[0].strip()}"
+    client = scope.get('client')
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Charges one token per analysis request before it reaches the router.
+
+    Rejected requests get a 429 without touching the app. Allowed ones
+    carry their decision in ``request.state.rate_limit``; routes may update
+    it (refunds for cached results, batch items) and the X-RateLimit-*
+    headers are added from its final value. Requests rejected as invalid
+    or because the queue is full get their token back.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or not settings.RATE_LIMIT_ENABLED
+                or scope['method'] != 'POST' or scope['path'].rstrip('/') not in LIMITED_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        key = client_key(scope)
+        decision = await rate_limiter.acquire(key)
+        if not decision.allowed:
+            metrics.RATE_LIMITED.inc()
+            body = json.dumps({"detail": f"Rate limit exceeded, retry in {decision.retry_after}s"}).encode()
+            await send({
+                'type': 'http.response.start',
+                'status': 429,
+                'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+                + _encode_headers(decision),
+            })
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        state = scope.setdefault('state', {})
+        state['rate_limit_key'] = key
+        state['rate_limit'] = decision
+
+        async def send_with_headers(message):
+            if message['type'] == 'http.response.start':
+                if message['status'] in REFUNDED_STATUSES:
+                    state['rate_limit'] = await rate_limiter.refund(key, 1)
+                message['headers'] = list(message.get('headers', [])) + _encode_headers(state['rate_limit'])
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _encode_headers(decision: RateLimitDecision):
+    return [(name.lower().encode(), value.encode()) for name, value in decision.headers().items()]
+
+
+def remaining(request: Request) -> Optional[int]:
+    decision = getattr(request.state, 'rate_limit', None)
+    return decision.remaining if decision else None
+
+
+async def settle(request: Request, reused: bool) -> Optional[int]:
+    """Refund a cached or shared result down to RATE_LIMIT_CACHED_COST; returns the tokens left"""
+    decision = getattr(request.state, 'rate_limit', None)
+    if decision is None:
+        return None
+    if reused and settings.RATE_LIMIT_CACHED_COST < 1:
+        decision = await rate_limiter.refund(request.state.rate_limit_key, 1 - settings.RATE_LIMIT_CACHED_COST)
+        request.state.rate_limit = decision
+    return decision.remaining
+
+
+async def acquire_item(request: Request, max_wait: float = settings.RATE_LIMIT_BATCH_MAX_WAIT):
+    """Take a token for one batch item, waiting for the bucket to refill.
+
+    Raises ``RateLimitExceeded`` if no token would be available within
+    ``max_wait`` seconds, so the item fails on its own while the rest of
+    the batch carries on.
+    """
+    if getattr(request.state, 'rate_limit', None) is None:
+        return
+    deadline = time.monotonic() + max_wait
+    while True:
+        decision = await rate_limiter.acquire(request.state.rate_limit_key)
+        request.state.rate_limit = decision
+        if decision.allowed:
+            return
+        if time.monotonic() + decision.retry_after > deadline:
+            metrics.RATE_LIMITED.inc()
+            raise RateLimitExceeded(f"Rate limit exceeded, retry in {decision.retry_after}s")
+        await asyncio.sleep(decision.retry_after)
@@ -1,85 +1,150 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, Header, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 import asyncio
-import time
-import uuid
-from datetime import datetime
+import json
 import logging
+from typing import Optional
 
-from app.models.analysis import AnalysisRequest, AnalysisResponse, AnalysisResult
-from app.services.scraper import WebScraper
-from app.services.ai_analyzer import AIAnalyzer
-from app.services.cache import CacheService
+from app.api import rate_limit
+from app.config import settings
+from app.models.analysis import (
+    AnalysisRequest, AnalysisResponse, AnalysisResult, JobStatus,
+    BatchAnalysisRequest, BatchAnalysisItem
+)
+from app.services.analysis_service import analyze_url, analyze_many
+from app.services.analysis_store import analysis_store
+from app.services.job_queue import job_queue, QueueFullError
+from app.services import progress, tracing
 from app.utils.validators import validate_url
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# In-memory store for demo (replace with Redis/DB in production)
-analysis_store = {}
-
 @router.post("/analyze", response_model=AnalysisResponse)
-async def analyze_website(request: AnalysisRequest):
+async def analyze_website(request: AnalysisRequest, response: Response, http_request: Request,
+                          x_debug_trace: Optional[str] = Header(None)):
     """Analyze a website for ethical AI practices"""
+    trace_mode = tracing.requested(x_debug_trace)
     try:
         # Validate URL
         url_str = str(request.url)
         if not validate_url(url_str):
             raise HTTPException(status_code=400, detail="Invalid URL provided")
         
-        # Check cache first
-        cache_key = f"analysis:{url_str}:{request.deep_scan}"
-        cached_result = await CacheService.get(cache_key)
-        if cached_result:
-            logger.info(f"Returning cached result for {url_str}")
-            return AnalysisResponse(success=True, data=cached_result)
-        
-        # Generate analysis ID
-        analysis_id = str(uuid.uuid4())
-        start_time = time.time()
-        
-        logger.info(f"Starting analysis {analysis_id} for {url_str}")
+        if request.background:
+            # Enqueue and return the job ID right away
+            try:
+                job = await job_queue.submit(url_str, request.deep_scan, trace_mode=trace_mode)
+            except QueueFullError as e:
+                    raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+            response.status_code = 202
+            if trace_mode:
+                response.headers["X-Trace-Id"] = job.trace_id
+            return AnalysisResponse(
+                success=True,
+                analysis_id=job.id,
+                status=job.status,
+                rate_limit_remaining=rate_limit.remaining(http_request)
+            )
         
-        # Step 1: Scrape website
-        async with WebScraper() as scraper:
-            scraped_data = await scraper.scrape_website(url_str, request.deep_scan)
+        async with tracing.traced('analyze', trace_mode, url=url_str, deep_scan=request.deep_scan) as trace:
+            if trace is not None:
+                response.headers["X-Trace-Id"] = trace.trace_id
+            result, reused = await analyze_url(url_str, request.deep_scan)
         
-        # Step 2: AI Analysis
-        analyzer = AIAnalyzer()
-        ai_analysis = await analyzer.analyze_ethics(scraped_data)
-        
-        # Step 3: Create result
-        analysis_time = time.time() - start_time
-        
-        result = AnalysisResult(
-            id=analysis_id,
-            url=url_str,
-            timestamp=datetime.utcnow(),
-            analysis_time=analysis_time,
-            **ai_analysis
+        return AnalysisResponse(
+            success=True,
+            data=result,
+            rate_limit_remaining=await rate_limit.settle(http_request, reused)
         )
         
-        # Store result (cache for 1 hour)
-        await CacheService.set(cache_key, result, expire=3600)
-        analysis_store[analysis_id] = result
-        
-        logger.info(f"Analysis {analysis_id} completed in {analysis_time:.2f}s")
-        
-        return AnalysisResponse(success=True, data=result)
-        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")
         return AnalysisResponse(
             success=False,
-            error=f"Analysis failed: {str(e)}"
+            error=f"Analysis failed: {str(e)}",
+            rate_limit_remaining=rate_limit.remaining(http_request)
         )
 
+@router.post("/analyze/batch")
+async def analyze_batch(request: BatchAnalysisRequest, http_request: Request):
+    """Analyze many websites, streaming each result as NDJSON when it finishes"""
+    if len(request.items) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large (max {settings.BATCH_MAX_ITEMS} items)"
+        )
+    
+    for item in request.items:
+        if not validate_url(str(item.url)):
+            raise HTTPException(status_code=400, detail=f"Invalid URL provided: {item.url}")
+    
+    concurrency = min(request.concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    
+    async def admit(index: int):
+        # The middleware's token pays for the first item; the others take one each as they start
+        if index > 0:
+            await rate_limit.acquire_item(http_request)
+    
+    async def settle(reused: bool):
+        await rate_limit.settle(http_request, reused)
+    
+    async def stream_results():
+        async for index, outcome in analyze_many(request.items, concurrency, admit=admit, settle=settle):
+            if isinstance(outcome, rate_limit.RateLimitExceeded):
+                response = AnalysisResponse(success=False, error=str(outcome))
+            elif isinstance(outcome, Exception):
+                logger.error(f"Batch item {index} failed: {str(outcome)}")
+                response = AnalysisResponse(success=False, error=f"Analysis failed: {str(outcome)}")
+            else:
+                response = AnalysisResponse(success=True, data=outcome)
+            
+            item = BatchAnalysisItem(index=index, url=str(request.items[index].url), response=response)
+            yield item.model_dump_json() + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @router.get("/analysis/{analysis_id}")
 async def get_analysis(analysis_id: str):
-    """Get analysis result by ID"""
-    if analysis_id not in analysis_store:
+    """Get analysis result or job status by ID"""
+    status = await job_queue.status(analysis_id)
+    if status is not None:
+        return status
+    
+    result = await analysis_store.get(analysis_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    return AnalysisResponse(success=True, data=analysis_store[analysis_id])
+    return AnalysisResponse(success=True, data=result, analysis_id=analysis_id, status=JobStatus.DONE)
 
-# ... existing code ... 
\ No newline at end of file
+@router.get("/analysis/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: str):
+    """Stream the progress of an analysis as Server-Sent Events"""
+    tracker = progress.get_tracker(analysis_id)
+    if tracker is not None:
+        payloads = tracker.subscribe(heartbeat=15)
+    elif await job_queue.status(analysis_id) is not None:
+        # Queued on another worker: follow its shared status instead of the detailed events
+        payloads = job_queue.follow_shared(analysis_id)
+    elif await analysis_store.get(analysis_id) is not None:
+        # Finished before tracking started (e.g. a synchronous analysis)
+        tracker = progress.ProgressTracker(analysis_id)
+        tracker.emit('done')
+        payloads = tracker.subscribe(heartbeat=15)
+    else:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    async def event_stream():
+        async for payload in payloads:
+            if payload is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {payload['event']}\ndata: {json.dumps(payload)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,15 +1,33 @@
 from datetime import datetime
 from fastapi import APIRouter
-import sys
-import psutil
-import asyncio
+from fastapi.responses import JSONResponse
+
+from app.services.ai_analyzer import ai_analyzer
+from app.services.cache import CacheService
+from app.services.warmup import warmup
+from app.utils.loop_monitor import loop_monitor
 
 router = APIRouter()
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness: the process is up and its event loop responsive"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat()
-    } 
\ No newline at end of file
+        "timestamp": datetime.utcnow().isoformat(),
+        "event_loop_lag": loop_monitor.stats(),
+        "llm": ai_analyzer.stats(),
+        "cache": CacheService.stats()
+    }
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness: 503 until the browser pool, LLM client and workers are warmed up"""
+    return JSONResponse(
+        status_code=200 if warmup.ready else 503,
+        content={
+            "status": "ready" if warmup.ready else "warming_up",
+            "timestamp": datetime.utcnow().isoformat(),
+            **warmup.stats()
+        }
+    )
\ No newline at end of file
@@ -2,16 +2,15 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 from typing import List
 
-print("USANDO ENV FILE:", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
-
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"),
         case_sensitive=False,
     )
 
-    GOOGLE_API_KEY: str
+    GOOGLE_API_KEY: str = ""
     DATABASE_URL: str = "sqlite:///./ethics_detector.db"
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
     DEBUG: bool = False
     SECRET_KEY: str = "your-secret-key-change-this"
     CORS_ORIGINS: List[str] = [
@@ -31,6 +30,131 @@ class Settings(BaseSettings):
     MAX_CONCURRENT_ANALYSES: int = 5
     USER_AGENT: str = os.getenv("USER_AGENT", "EthicsDetector/1.0")
     SCRAPING_TIMEOUT: int = int(os.getenv("SCRAPING_TIMEOUT", "60"))
+    # Largest page accepted. Browser navigations are cut off early only when the response
+    # declares Content-Length; chunked or compressed pages are checked once they have loaded
     MAX_PAGE_SIZE: str = os.getenv("MAX_PAGE_SIZE", "5MB")
 
+    # Browser Pool
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+    BROWSER_CONTEXTS_PER_BROWSER: int = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "3"))
+    BROWSER_MAX_PAGES: int = int(os.getenv("BROWSER_MAX_PAGES", "200"))
+    BROWSER_MAX_MEMORY_MB: int = int(os.getenv("BROWSER_MAX_MEMORY_MB", "1024"))
+
+    # Cache
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1000"))
+    CACHE_LOCAL_TTL: int = int(os.getenv("CACHE_LOCAL_TTL", "300"))
+    CACHE_REDIS_ENABLED: bool = os.getenv("CACHE_REDIS_ENABLED", "True").lower() == "true"
+    CACHE_REDIS_TIMEOUT: float = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+    CACHE_REDIS_RETRY_SECONDS: int = int(os.getenv("CACHE_REDIS_RETRY_SECONDS", "30"))
+
+    # Single-flight coalescing of concurrent analyses
+    SINGLEFLIGHT_DISTRIBUTED: bool = os.getenv("SINGLEFLIGHT_DISTRIBUTED", "False").lower() == "true"
+    SINGLEFLIGHT_LOCK_TTL: int = int(os.getenv("SINGLEFLIGHT_LOCK_TTL", "180"))
+    SINGLEFLIGHT_POLL_INTERVAL: float = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", "0.5"))
+
+    # Background analysis queue (workers = MAX_CONCURRENT_ANALYSES)
+    ANALYSIS_QUEUE_MAX_SIZE: int = int(os.getenv("ANALYSIS_QUEUE_MAX_SIZE", "100"))
+    ANALYSIS_JOB_RETENTION: int = int(os.getenv("ANALYSIS_JOB_RETENTION", "3600"))
+
+    # Batch analysis
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "2000"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "10"))
+
+    # Scraper fetch path: "auto" tries plain HTTP first, "browser" or "http" force one path
+    SCRAPER_FETCH_MODE: str = os.getenv("SCRAPER_FETCH_MODE", "auto")
+    SCRAPER_HTTP_TIMEOUT: float = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+    SCRAPER_HTTP_MAX_CONNECTIONS: int = int(os.getenv("SCRAPER_HTTP_MAX_CONNECTIONS", "50"))
+    SCRAPER_HTTP_MIN_TEXT: int = int(os.getenv("SCRAPER_HTTP_MIN_TEXT", "500"))
+
+    # Browser request blocking and wait strategy
+    SCRAPER_BLOCKED_RESOURCE_TYPES: List[str] = ["image", "media", "font"]
+    SCRAPER_TRACKER_DOMAINS: List[str] = [
+        "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+        "facebook.net", "hotjar.com", "clarity.ms", "segment.com", "segment.io",
+        "mixpanel.com", "amplitude.com", "fullstory.com", "intercom.io", "intercomcdn.com",
+        "drift.com", "crisp.chat", "tawk.to", "hs-scripts.com", "hs-analytics.net", "zdassets.com",
+        "ads.linkedin.com", "bat.bing.com", "analytics.tiktok.com"
+    ]
+    SCRAPER_WAIT_UNTIL: str = os.getenv("SCRAPER_WAIT_UNTIL", "domcontentloaded")
+    SCRAPER_SETTLE_MS: int = int(os.getenv("SCRAPER_SETTLE_MS", "1500"))
+
+    # HTML extraction backend: "lxml" (single pass) or "bs4"
+    SCRAPER_EXTRACTOR: str = os.getenv("SCRAPER_EXTRACTOR", "lxml")
+
+    # HTML parsing executor: "process", "thread" or "inline" (on the event loop)
+    PARSER_EXECUTOR: str = os.getenv("PARSER_EXECUTOR", "process")
+    PARSER_WORKERS: int = int(os.getenv("PARSER_WORKERS", "2"))
+    PARSER_MAX_PENDING: int = int(os.getenv("PARSER_MAX_PENDING", "32"))
+
+    # LLM response cache keyed by a hash of model, prompt version and content
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+
+    # How long a scraped redirect (e.g. apex -> www) is remembered for cache keys
+    URL_REDIRECT_TTL: int = int(os.getenv("URL_REDIRECT_TTL", str(7 * 24 * 3600)))
+
+    # Database pool and batched writes of finished analyses
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_BATCH_SIZE: int = int(os.getenv("DB_BATCH_SIZE", "50"))
+    DB_FLUSH_INTERVAL: float = float(os.getenv("DB_FLUSH_INTERVAL", "0.5"))
+    DB_RECENT_CACHE_SIZE: int = int(os.getenv("DB_RECENT_CACHE_SIZE", "500"))
+
+    # Local rule-based pre-screen: extra lexicon (JSON) and skipping the LLM on clear-cut cases
+    ETHICS_LEXICON_PATH: str = os.getenv("ETHICS_LEXICON_PATH", "")
+    ETHICS_ENGINE_SKIP_LLM: bool = os.getenv("ETHICS_ENGINE_SKIP_LLM", "False").lower() == "true"
+
+    # Approximate token budget for the page content sent to the LLM
+    PROMPT_TOKEN_BUDGET: int = int(os.getenv("PROMPT_TOKEN_BUDGET", "2500"))
+
+    # LLM client: concurrency limit, retries with jittered backoff, circuit breaker
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+    LLM_CIRCUIT_FAILURES: int = int(os.getenv("LLM_CIRCUIT_FAILURES", "5"))
+    LLM_CIRCUIT_RESET: float = float(os.getenv("LLM_CIRCUIT_RESET", "30"))
+
+    # LLM provider ("gemini" or "fake" for offline runs) and model tier per scan type
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")
+    LLM_MODEL_QUICK: str = os.getenv("LLM_MODEL_QUICK", "gemini-1.5-flash")
+    LLM_MODEL_DEEP: str = os.getenv("LLM_MODEL_DEEP", "gemini-1.5-pro")
+    LLM_FAKE_LATENCY: float = float(os.getenv("LLM_FAKE_LATENCY", "1.0"))
+    LLM_FAKE_JITTER: float = float(os.getenv("LLM_FAKE_JITTER", "0.5"))
+    LLM_FAKE_ERROR_RATE: float = float(os.getenv("LLM_FAKE_ERROR_RATE", "0"))
+    LLM_FAKE_ERROR_KIND: str = os.getenv("LLM_FAKE_ERROR_KIND", "unavailable")
+
+    # Scraping in this process ("local") or in scrape workers ("remote") fed over a Redis list;
+    # run workers with `python -m app.services.scrape_worker`
+    SCRAPER_MODE: str = os.getenv("SCRAPER_MODE", "local")
+    SCRAPE_QUEUE_KEY: str = os.getenv("SCRAPE_QUEUE_KEY", "scrape:jobs")
+    SCRAPE_REMOTE_TIMEOUT: float = float(os.getenv("SCRAPE_REMOTE_TIMEOUT", "120"))
+    SCRAPE_RESULT_TTL: int = int(os.getenv("SCRAPE_RESULT_TTL", "60"))
+    SCRAPE_WORKER_CONCURRENCY: int = int(os.getenv("SCRAPE_WORKER_CONCURRENCY", "6"))
+
+    # Token-bucket rate limit of analysis requests per client IP or known API key (X-API-Key).
+    # Refills at RATE_LIMIT_PER_MINUTE; RATE_LIMIT_BURST (0: same as per minute) requests at once.
+    # Cached results cost RATE_LIMIT_CACHED_COST tokens; distributed buckets need Redis.
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    RATE_LIMIT_BURST: int = int(os.getenv("RATE_LIMIT_BURST", "0"))
+    RATE_LIMIT_CACHED_COST: float = float(os.getenv("RATE_LIMIT_CACHED_COST", "0"))
+    RATE_LIMIT_DISTRIBUTED: bool = os.getenv("RATE_LIMIT_DISTRIBUTED", "False").lower() == "true"
+    RATE_LIMIT_API_KEYS: str = os.getenv("RATE_LIMIT_API_KEYS", "")  # comma-separated
+    RATE_LIMIT_TRUST_FORWARDED: bool = os.getenv("RATE_LIMIT_TRUST_FORWARDED", "False").lower() == "true"
+    RATE_LIMIT_MAX_CLIENTS: int = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "10000"))
+    # Batch items take a token each as they start, waiting up to this long for the bucket to refill
+    RATE_LIMIT_BATCH_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_BATCH_MAX_WAIT", "300"))
+
+    # Opt-in tracing: a span tree per analysis, optionally with a sampling CPU profile.
+    # Traced when sampled or, if TRACE_HEADER_ENABLED, on "X-Debug-Trace: 1" or "X-Debug-Trace: profile".
+    # TRACE_EXPORTER: "json" (files in TRACE_DIR), "otlp" (OTLP/HTTP collector) or "json,otlp"
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+    TRACE_HEADER_ENABLED: bool = os.getenv("TRACE_HEADER_ENABLED", "False").lower() == "true"
+    TRACE_PROFILE_SAMPLED: bool = os.getenv("TRACE_PROFILE_SAMPLED", "False").lower() == "true"
+    TRACE_PROFILE_INTERVAL: float = float(os.getenv("TRACE_PROFILE_INTERVAL", "0.01"))
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "json")
+    TRACE_DIR: str = os.getenv("TRACE_DIR", "traces")
+    TRACE_OTLP_ENDPOINT: str = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+
 settings = Settings() 
\ No newline at end of file
@@ -1,7 +1,61 @@
-# ... existing code ... 
+# ... existing code ...
+
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.models.database import Base
+
+logger = logging.getLogger(__name__)
+
+# Sync driver prefixes from DATABASE_URL mapped to their async drivers
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+engine: Optional[AsyncEngine] = None
+session_factory: Optional[async_sessionmaker[AsyncSession]] = None
+
+def async_database_url(url: str) -> str:
+    """Rewrite e.g. ``postgres://`` or ``sqlite:///`` to its async driver"""
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
 
 async def init_db():
-    pass
+    global engine, session_factory
+
+    url = async_database_url(settings.DATABASE_URL)
+    options = {}
+    if not url.startswith("sqlite"):
+        # SQLite connections are cheap and file-locked; only size the pool for real servers
+        options = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+
+    engine = create_async_engine(url, **options)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+def get_session() -> AsyncSession:
+    if session_factory is None:
+        raise RuntimeError("Database not initialized")
+    return session_factory()
 
 async def close_db():
-    pass 
\ No newline at end of file
+    global engine, session_factory
+
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+        session_factory = None
@@ -8,9 +8,16 @@ class EthicsCategory(str, Enum):
     WARNING = "warning"
     DANGER = "danger"
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
 class AnalysisRequest(BaseModel):
     url: HttpUrl
     deep_scan: bool = Field(default=False, description="Análisis profundo incluyendo términos de servicio")
+    background: bool = Field(default=False, description="Encolar el análisis y devolver su ID de inmediato")
 
 class CriteriaScore(BaseModel):
     privacy: int = Field(ge=0, le=10)
@@ -27,6 +34,7 @@ class RedFlag(BaseModel):
 class AnalysisResult(BaseModel):
     id: str
     url: str
+    canonical_url: Optional[str] = None
     timestamp: datetime
     
     # Core Results
@@ -43,6 +51,7 @@ class AnalysisResult(BaseModel):
     
     # Technical Details
     analysis_time: float = Field(description="Tiempo de análisis en segundos")
+    stage_timings: Dict[str, int] = Field(default={}, description="Tiempo por etapa en milisegundos")
     pages_analyzed: int
     content_length: int
     
@@ -54,4 +63,15 @@ class AnalysisResponse(BaseModel):
     success: bool
     data: Optional[AnalysisResult] = None
     error: Optional[str] = None
-    rate_limit_remaining: Optional[int] = None 
\ No newline at end of file
+    rate_limit_remaining: Optional[int] = None
+    analysis_id: Optional[str] = None
+    status: Optional[JobStatus] = None 
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Análisis simultáneos (limitado por el servidor)")
+
+class BatchAnalysisItem(BaseModel):
+    index: int
+    url: str
+    response: AnalysisResponse
\ No newline at end of file
@@ -1 +1,32 @@
-# ... existing code ... 
\ No newline at end of file
+# ... existing code ...
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class AnalysisRecord(Base):
+    """A finished analysis; ``data`` holds the full AnalysisResult as JSON"""
+
+    __tablename__ = "analyses"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    url: Mapped[str] = mapped_column(Text)
+    canonical_url: Mapped[str] = mapped_column(String(2048))
+    deep_scan: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Produced by the local fallback because the LLM was unavailable; never reused
+    degraded: Mapped[bool] = mapped_column(Boolean, default=False)
+    timestamp: Mapped[datetime] = mapped_column(DateTime, index=True)
+    overall_score: Mapped[int] = mapped_column(Integer)
+    category: Mapped[str] = mapped_column(String(16))
+    data: Mapped[str] = mapped_column(Text)
+
+    __table_args__ = (
+        # Latest analysis of a URL: WHERE canonical_url = ? AND deep_scan = ? ORDER BY timestamp DESC
+        Index("ix_analyses_canonical_url", "canonical_url", "deep_scan", "timestamp"),
+    )
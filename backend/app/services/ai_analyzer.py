@@ -1,67 +1,30 @@
-import google.generativeai as genai
+import functools
+import hashlib
 import json
 import logging
-from typing import Dict, Any, List
+import random
+import time
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
 import asyncio
 import re
 
 from app.config import settings
 from app.models.analysis import RedFlag, CriteriaScore, EthicsCategory
+from app.services import metrics, progress, tracing
+from app.services.cache import CacheService
+from app.services.ethics_engine import ethics_engine
+from app.services.llm_providers import CONTENT_MARKER, LLMProvider, create_provider, model_for, provider_errors
+from app.services.prompt_builder import prompt_builder
+from app.utils.circuit_breaker import CircuitBreaker
 
 logger = logging.getLogger(__name__)
 
-class AIAnalyzer:
-    def __init__(self):
-        if settings.GOOGLE_API_KEY:
-            genai.configure(api_key=settings.GOOGLE_API_KEY)
-            self.gemini_client = genai.GenerativeModel('gemini-1.5-pro')
-        else:
-            self.gemini_client = None
-    
-    async def analyze_ethics(self, scraped_data: Dict) -> Dict[str, Any]:
-        """Analyze ethics of scraped content"""
-        try:
-            # Prepare content for analysis
-            analysis_content = self._prepare_content_for_analysis(scraped_data)
-            
-            # Get AI analysis
-            if self.gemini_client:
-                analysis = await self._analyze_with_gemini(analysis_content)
-            else:
-                raise Exception("No AI service available (Gemini API key not configured)")
-            
-            # Process and structure the analysis
-            structured_analysis = self._structure_analysis(analysis, scraped_data)
-            
-            return structured_analysis
-            
-        except Exception as e:
-            logger.error(f"Error in AI analysis: {str(e)}")
-            raise Exception(f"AI analysis failed: {str(e)}")
-
-    def _prepare_content_for_analysis(self, scraped_data: Dict) -> str:
-        """Prepare content for AI analysis"""
-        content_parts = [
-            f"Website: {scraped_data.get('url', 'Unknown')}",
-            f"Title: {scraped_data.get('title', 'No title')}",
-            f"Main content: {scraped_data.get('content', '')[:5000]}",  # Limit content
-        ]
-        
-        # Add additional content if available
-        additional = scraped_data.get('additional_content', {})
-        for key, value in additional.items():
-            content_parts.append(f"{key.replace('_', ' ').title()}: {value[:2000]}")
-        
-        # Add metadata
-        metadata = scraped_data.get('metadata', {})
-        if metadata:
-            content_parts.append(f"Metadata: {json.dumps(metadata, indent=2)[:1000]}")
-        
-        return "\n\n".join(content_parts)
+# Bump whenever the prompt or the response handling changes meaning, so
+# cached LLM responses from the previous version are no longer reused
+PROMPT_VERSION = 2
 
-    async def _analyze_with_gemini(self, content: str) -> str:
-        """Analyze content using Google Gemini"""
-        prompt = """Eres un experto analista de ética en IA. Tu trabajo es evaluar startups de IA de manera objetiva y sin sesgos.
+ANALYSIS_PROMPT = """Eres un experto analista de ética en IA. Tu trabajo es evaluar startups de IA de manera objetiva y sin sesgos.
 
 Analiza el siguiente contenido web y determina si la propuesta es ética o no. Considera:
 
@@ -95,20 +58,249 @@ Responde ÚNICAMENTE con un objeto JSON válido que siga esta estructura:
 }
 
 Se ULTRA CRÍTICO y objetivo. Detecta patrones ocultos, dark patterns, lenguaje evasivo. No incluyas nada antes o después del JSON."""
+
+
+@functools.lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """Provider errors worth retrying: rate limits, overload and transient server or network failures"""
+    errors = provider_errors()
+    return (
+        errors.ResourceExhausted,
+        errors.TooManyRequests,
+        errors.ServiceUnavailable,
+        errors.InternalServerError,
+        errors.BadGateway,
+        errors.GatewayTimeout,
+        errors.DeadlineExceeded,
+        asyncio.TimeoutError,
+        ConnectionError,
+    )
+
+# Marks results produced without the LLM because it failed; they are not cached
+DEGRADED_PATTERN = "analysis_error"
+
+# Number of recent calls kept for the latency and queue-wait percentiles
+LATENCY_WINDOW = 500
+
+
+class LLMUnavailableError(Exception):
+    """Raised when the provider is degraded: circuit open or retries exhausted"""
+
+
+def summarize_ms(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(samples)
+    return {
+        'p50': round(ordered[len(ordered) // 2] * 1000, 1),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+        'max': round(ordered[-1] * 1000, 1),
+    }
+
+
+class AIAnalyzer:
+    """Process-wide LLM client, started once in the app lifespan.
+
+    At most ``LLM_MAX_CONCURRENCY`` calls are in flight; the rest wait
+    their turn. Retryable provider errors are retried with jittered
+    exponential backoff, and a circuit breaker stops calling a degraded
+    provider so requests fall back to the local rule-based analysis.
+    """
+
+    def __init__(self):
+        self.provider: Optional[LLMProvider] = None
+        self.started = False
+        self.breaker = CircuitBreaker('llm', settings.LLM_CIRCUIT_FAILURES, settings.LLM_CIRCUIT_RESET)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._starting = asyncio.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self._queue_waits: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def start(self, provider: Optional[LLMProvider] = None):
+        if self.started:
+            return
+        self.provider = provider or create_provider()
+        self._slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self.started = True
+
+    async def warmup(self):
+        """Start with the provider client built off the event loop: importing the Gemini SDK takes about a second"""
+        async with self._starting:
+            if not self.started:
+                self.start(await asyncio.to_thread(create_provider))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'circuit': self.breaker.state,
+            'circuit_trips': self.breaker.trips,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'calls': self.calls,
+            'failures': self.failures,
+            'retries': self.retries,
+            'short_circuited': self.short_circuited,
+            'provider': self.provider.name if self.provider else None,
+            'queue_wait_ms': summarize_ms(self._queue_waits),
+            'latency_ms': {model: summarize_ms(samples) for model, samples in self._latencies.items()},
+        }
+    
+    async def analyze_ethics(self, scraped_data: Dict, deep_scan: bool = False) -> Dict[str, Any]:
+        """Analyze ethics of scraped content, with the model tier for the scan type"""
+        if not self.started:
+            await self.warmup()
+        try:
+            # Prepare content for analysis
+            with progress.stage('prompt_build'):
+                analysis_content = self._prepare_content_for_analysis(scraped_data)
+            
+            # Instant local verdict: reported as progress, and enough on its own for clear-cut cases
+            with progress.stage('prescreen', event='prescreen_completed') as info:
+                screen = ethics_engine.screen(scraped_data)
+                info.update(provisional_score=screen.overall_score, provisional_category=screen.category.value)
+            
+            if settings.ETHICS_ENGINE_SKIP_LLM and screen.clear_cut:
+                progress.emit('llm_skipped', reason='clear_cut')
+                return screen.to_analysis(scraped_data)
+            
+            # Reuse the response for byte-identical content, whatever URL served it
+            model = model_for(deep_scan)
+            cache_key = self._llm_cache_key(analysis_content, model)
+            analysis = await self._get_cached_response(cache_key)
+            cached = analysis is not None
+            
+            # Get AI analysis
+            if cached:
+                progress.emit('llm_cache_hit')
+                metrics.CACHE_HITS.labels(layer='llm').inc()
+            elif self.provider:
+                try:
+                    analysis = await self._call_llm(analysis_content, model)
+                except LLMUnavailableError as e:
+                    logger.warning(f"LLM unavailable, using local analysis: {str(e)}")
+                    progress.emit('llm_unavailable', reason=str(e))
+                    return self._fallback_analysis(scraped_data, reason='llm_unavailable')
+            else:
+                raise Exception("No AI service available (Gemini API key not configured)")
+            
+            # Process and structure the analysis
+            with progress.stage('structure', event='result_structured'):
+                structured_analysis = self._structure_analysis(analysis, scraped_data)
+            
+            # Cache only responses that structured cleanly; drop a cached one that no longer does
+            if DEGRADED_PATTERN not in structured_analysis["detected_patterns"]:
+                if not cached:
+                    await self._cache_response(cache_key, analysis)
+            elif cached:
+                await CacheService.delete(cache_key)
+            
+            return structured_analysis
+            
+        except Exception as e:
+            logger.error(f"Error in AI analysis: {str(e)}")
+            raise Exception(f"AI analysis failed: {str(e)}")
+
+    def _prepare_content_for_analysis(self, scraped_data: Dict) -> str:
+        """Prepare content for AI analysis: the most relevant passages within the token budget"""
+        return prompt_builder.build(scraped_data)
+
+    def _llm_cache_key(self, analysis_content: str, model: str) -> str:
+        """Hash of everything that determines the LLM response"""
+        # The "Website:" line is the only part that varies between www/apex,
+        # redirects and tracking params, so it is left out of the fingerprint
+        lines = analysis_content.split("\n\n", 1)
+        if lines[0].startswith("Website:"):
+            analysis_content = lines[1] if len(lines) > 1 else ""
         
-        full_prompt = f"{prompt}\n\nContenido a analizar:\n{content}"
+        digest = hashlib.sha256()
+        for part in (self.provider.name if self.provider else "", model, str(PROMPT_VERSION),
+                     ANALYSIS_PROMPT, analysis_content):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return f"llm:{digest.hexdigest()}"
+
+    async def _get_cached_response(self, cache_key: str) -> Optional[str]:
+        """Cached raw LLM response, if this content was analyzed before"""
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+        cached = await CacheService.get(cache_key, model=None)
+        return cached if isinstance(cached, str) else None
+
+    async def _cache_response(self, cache_key: str, ai_response: str):
+        """Store the raw response; only called once it structured into a valid analysis"""
+        if not settings.LLM_CACHE_ENABLED:
+            return
+        await CacheService.set(cache_key, ai_response, expire=settings.LLM_CACHE_TTL)
 
+    async def _call_llm(self, content: str, model: str) -> str:
+        """Call the LLM within the concurrency limit, retrying transient errors"""
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise LLMUnavailableError("circuit open")
+        
+        queued_at = time.perf_counter()
+        self.waiting += 1
         try:
-            response = await self.gemini_client.generate_content_async(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,
-                    response_mime_type="application/json",
-                )
-            )
-            return response.text
+            with progress.stage('llm_queue'):
+                await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self._queue_waits.append(time.perf_counter() - queued_at)
+        
+        self.in_flight += 1
+        try:
+            self.calls += 1
+            progress.emit('llm_request_sent', prompt_length=len(content), model=model)
+            with progress.stage('llm', event='llm_response_received'):
+                return await self._call_with_retries(content, model)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def _call_with_retries(self, content: str, model: str) -> str:
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            started = time.perf_counter()
+            try:
+                with tracing.span('llm.attempt', attempt=attempt + 1, model=model):
+                    response = await asyncio.wait_for(self._generate(content, model), settings.LLM_TIMEOUT)
+            except retryable_errors() as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt == settings.LLM_MAX_RETRIES or not self.breaker.allow():
+                    raise LLMUnavailableError(f"{type(e).__name__} after {attempt + 1} attempts")
+                
+                # Full jitter keeps a burst of failed calls from retrying in lockstep
+                delay = random.uniform(0, min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** attempt))
+                self.retries += 1
+                logger.warning(f"Retrying LLM call in {delay:.1f}s after {type(e).__name__}")
+                await asyncio.sleep(delay)
+                continue
+            except provider_errors().InvalidArgument:
+                # The request's fault, not the provider's
+                raise
+            except Exception:
+                self.failures += 1
+                self.breaker.record_failure()
+                raise
+            
+            samples = self._latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW))
+            samples.append(time.perf_counter() - started)
+            self.breaker.record_success()
+            return response
+
+    async def _generate(self, content: str, model: str) -> str:
+        """Analyze content with the configured LLM provider"""
+        full_prompt = f"{ANALYSIS_PROMPT}\n\n{CONTENT_MARKER}{content}"
+
+        try:
+            return await self.provider.generate(full_prompt, model)
         except Exception as e:
-            logger.error(f"Gemini API error: {str(e)}")
+            logger.error(f"LLM API error ({self.provider.name}/{model}): {str(e)}")
             raise
 
     def _structure_analysis(self, ai_response: str, scraped_data: Dict) -> Dict[str, Any]:
@@ -137,28 +329,30 @@ Se ULTRA CRÍTICO y objetivo. Detecta patrones ocultos, dark patterns, lenguaje
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response as JSON: {str(e)}")
+            metrics.JSON_PARSE_FAILURES.inc()
             # Fallback analysis
-            return self._fallback_analysis(scraped_data)
+            return self._fallback_analysis(scraped_data, reason='invalid_json')
         except Exception as e:
             logger.error(f"Error structuring analysis: {str(e)}")
-            return self._fallback_analysis(scraped_data)
+            return self._fallback_analysis(scraped_data, reason='structure_error')
 
-    def _fallback_analysis(self, scraped_data: Dict) -> Dict[str, Any]:
-        """Fallback analysis when AI fails"""
-        return {
-            "overall_score": 50,
-            "category": "warning",
+    def _fallback_analysis(self, scraped_data: Dict, reason: str) -> Dict[str, Any]:
+        """Fallback analysis when AI fails: the local rule-based verdict"""
+        metrics.FALLBACK_ANALYSES.labels(reason=reason).inc()
+        analysis = ethics_engine.screen(scraped_data).to_analysis(scraped_data)
+        analysis.update({
             "title": "Análisis Limitado",
-            "justification": "No se pudo completar el análisis completo. Se recomienda revisión manual.",
-            "criteria_scores": CriteriaScore(privacy=5, social_impact=5, transparency=5, fairness=5),
-            "red_flags": [RedFlag(
-                severity="medium",
-                category="technical",
-                description="Análisis automático no disponible",
-                evidence="Error en el procesamiento de IA"
-            )],
-            "detected_patterns": ["analysis_error"],
-            "ai_confidence": 0.1,
-            "pages_analyzed": scraped_data.get("pages_analyzed", 1),
-            "content_length": scraped_data.get("content_length", 0)
-        } 
\ No newline at end of file
+            "justification": "No se pudo completar el análisis con IA. " + analysis["justification"],
+            "ai_confidence": min(analysis["ai_confidence"], 0.3),
+        })
+        analysis["red_flags"].append(RedFlag(
+            severity="medium",
+            category="technical",
+            description="Análisis automático no disponible",
+            evidence="Error en el procesamiento de IA"
+        ))
+        analysis["detected_patterns"].append(DEGRADED_PATTERN)
+        return analysis
+
+
+ai_analyzer = AIAnalyzer()
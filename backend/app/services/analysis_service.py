@@ -0,0 +1,176 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+import logging
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
+
+from app.config import settings
+from app.models.analysis import AnalysisRequest, AnalysisResult
+from app.services.scraper import WebScraper
+from app.services.ai_analyzer import DEGRADED_PATTERN, ai_analyzer
+from app.services.analysis_store import analysis_store
+from app.services.browser_pool import browser_pool
+from app.services.cache import CacheService
+from app.services.remote_scraper import RemoteScraper
+from app.services.singleflight import single_flight
+from app.services import metrics, progress, tracing
+from app.utils.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_TTL = 3600
+
+# Scrape + LLM pipelines running at once in this process, whichever route started them
+analysis_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_ANALYSES)
+
+
+def analysis_cache_key(url_str: str, deep_scan: bool) -> str:
+    return f"analysis:{canonicalize_url(url_str)}:{deep_scan}"
+
+
+def redirect_cache_key(canonical_url: str) -> str:
+    return f"redirect:{canonical_url}"
+
+
+def create_scraper() -> Union[WebScraper, RemoteScraper]:
+    """Scraper for one analysis: in this process, or a client of the scrape workers"""
+    if settings.SCRAPER_MODE == 'remote':
+        return RemoteScraper()
+    return WebScraper(pool=browser_pool)
+
+
+async def resolve_canonical_url(url_str: str) -> str:
+    """Canonical form of a URL, following redirects recorded by earlier scrapes"""
+    canonical_url = canonicalize_url(url_str)
+    target = await CacheService.get(redirect_cache_key(canonical_url), model=None)
+    return target if isinstance(target, str) else canonical_url
+
+
+async def analyze_url(url_str: str, deep_scan: bool = False,
+                      analysis_id: Optional[str] = None) -> Tuple[AnalysisResult, bool]:
+    """Return the analysis for a URL and whether it was reused.
+
+    A result is reused when it comes from the cache or from another
+    request's in-flight analysis: concurrent requests for the same cache
+    key share a single scrape and LLM call through the single-flight layer.
+    Keys use the canonical URL, so www, tracking-param and redirect
+    variants of a page all share one analysis.
+    """
+    canonical_url = await resolve_canonical_url(url_str)
+    cache_key = analysis_cache_key(canonical_url, deep_scan)
+    cached_result = await CacheService.get(cache_key)
+    if cached_result:
+        logger.info(f"Returning cached result for {url_str}")
+        progress.emit('cache_hit')
+        metrics.CACHE_HITS.labels(layer='analysis').inc()
+        return cached_result, True
+    
+    # The cache may have been lost (restart, eviction); the store still has recent results
+    stored_result = await analysis_store.find_recent(canonical_url, deep_scan, max_age=ANALYSIS_CACHE_TTL)
+    if stored_result:
+        logger.info(f"Returning stored result for {url_str}")
+        await CacheService.set(cache_key, stored_result, expire=ANALYSIS_CACHE_TTL)
+        progress.emit('cache_hit')
+        metrics.CACHE_HITS.labels(layer='store').inc()
+        return stored_result, True
+
+    analysis_id = analysis_id or str(uuid.uuid4())
+    result = await single_flight.do(
+        cache_key,
+        lambda: run_analysis(url_str, deep_scan, analysis_id, canonical_url),
+        lookup=lambda: CacheService.get(cache_key),
+    )
+    shared = result.id != analysis_id
+    if shared:
+        metrics.CACHE_HITS.labels(layer='shared').inc()
+    return result, shared
+
+
+async def analyze_many(requests: List[AnalysisRequest], concurrency: int,
+                       admit: Optional[Callable[[int], Awaitable[None]]] = None,
+                       settle: Optional[Callable[[bool], Awaitable[None]]] = None,
+                       ) -> AsyncIterator[Tuple[int, Union[AnalysisResult, Exception]]]:
+    """Analyze requests with bounded parallelism, yielding results as they finish.
+
+    Yields ``(index, result)`` pairs in completion order; failures are
+    yielded as the exception instead of aborting the whole batch.
+    ``admit(index)`` runs as each item starts and may raise to fail it
+    (e.g. rate limiting); ``settle(reused)`` runs after each success.
+    """
+    pending = iter(enumerate(requests))
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        for index, request in pending:
+            try:
+                if admit is not None:
+                    await admit(index)
+                result, reused = await analyze_url(str(request.url), request.deep_scan)
+                if settle is not None:
+                    await settle(reused)
+                await finished.put((index, result))
+            except Exception as e:
+                await finished.put((index, e))
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(requests)))]
+    try:
+        for _ in range(len(requests)):
+            yield await finished.get()
+    finally:
+        # Stop outstanding work if the consumer goes away early
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def run_analysis(url_str: str, deep_scan: bool, analysis_id: str, canonical_url: str) -> AnalysisResult:
+    """Scrape and analyze a URL, then cache the result under its canonical URL.
+
+    At most ``MAX_CONCURRENT_ANALYSES`` run at once across the synchronous,
+    background and batch routes; the rest wait for a slot.
+    """
+    async with analysis_slots:
+        start_time = time.time()
+
+        logger.info(f"Starting analysis {analysis_id} for {url_str}")
+
+        with metrics.ANALYSES_IN_FLIGHT.track_inprogress(), progress.collect_timings() as timings:
+            # Step 1: Scrape website
+            async with create_scraper() as scraper:
+                scraped_data = await scraper.scrape_website(url_str, deep_scan)
+
+            # Step 2: AI Analysis
+            ai_analysis = await ai_analyzer.analyze_ethics(scraped_data, deep_scan)
+
+    # Step 3: Create result
+    analysis_time = time.time() - start_time
+    metrics.ANALYSIS_DURATION.labels(deep_scan=str(deep_scan).lower()).observe(analysis_time)
+    # Where the URL ended up: later lookups follow the redirect to this key, in the cache and the store
+    final_url = canonicalize_url(scraped_data.get('final_url') or url_str)
+
+    with tracing.span('pydantic.validate'):
+        result = AnalysisResult(
+            id=analysis_id,
+            url=url_str,
+            canonical_url=final_url,
+            timestamp=datetime.utcnow(),
+            analysis_time=analysis_time,
+            stage_timings={name: round(duration * 1000) for name, duration in timings.items()},
+            **ai_analysis
+        )
+
+    # Persist, and cache for 1 hour unless the LLM was unavailable
+    degraded = DEGRADED_PATTERN in result.detected_patterns
+    analysis_store.save(result, deep_scan, degraded)
+    if not degraded:
+        await CacheService.set(analysis_cache_key(canonical_url, deep_scan), result, expire=ANALYSIS_CACHE_TTL)
+    
+    # Step 4: Record where the URL redirected, so the target's key is used next time
+    if final_url != canonical_url:
+        await CacheService.set(redirect_cache_key(canonical_url), final_url, expire=settings.URL_REDIRECT_TTL)
+        if not degraded:
+            await CacheService.set(analysis_cache_key(final_url, deep_scan), result, expire=ANALYSIS_CACHE_TTL)
+
+    logger.info(f"Analysis {analysis_id} completed in {analysis_time:.2f}s")
+    return result
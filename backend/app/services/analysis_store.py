@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+
+from app.config import settings
+from app.database import connection
+from app.models.analysis import AnalysisResult
+from app.models.database import AnalysisRecord
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStore:
+    """Persistent store of finished analyses, shared by every worker.
+
+    ``save`` only buffers the result; a background task writes buffered
+    results in one multi-row INSERT every ``flush_interval`` seconds or as
+    soon as ``batch_size`` are waiting. Results saved by this process are
+    also kept in a small LRU so they can be read back before the flush.
+    Lookups treat database errors as a miss, so an outage degrades to
+    re-running analyses instead of failing them. When a batch fails its rows
+    are retried one by one, so a single row the database rejects is dropped
+    instead of holding back every result buffered with it.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = settings.DB_BATCH_SIZE,
+        flush_interval: float = settings.DB_FLUSH_INTERVAL,
+        recent_size: int = settings.DB_RECENT_CACHE_SIZE,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recent_size = recent_size
+        self._pending: Dict[str, dict] = {}
+        self._recent: "OrderedDict[str, AnalysisResult]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.flush_errors = 0
+        self.dropped = 0
+        self.read_errors = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            # Let a flush already in progress finish; cancelling it mid-INSERT would lose its rows
+            async with self._flush_lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Write whatever is still buffered before the engine goes away
+        await self.flush()
+
+    def save(self, result: AnalysisResult, deep_scan: bool = False, degraded: bool = False):
+        self._pending[result.id] = {
+            "id": result.id,
+            "url": result.url,
+            "canonical_url": result.canonical_url or result.url,
+            "deep_scan": deep_scan,
+            "degraded": degraded,
+            "timestamp": result.timestamp,
+            "overall_score": result.overall_score,
+            "category": result.category.value,
+            "data": result.model_dump_json(),
+        }
+        self._remember(result)
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def get(self, analysis_id: str) -> Optional[AnalysisResult]:
+        if analysis_id in self._recent:
+            self._recent.move_to_end(analysis_id)
+            return self._recent[analysis_id]
+
+        return await self._read(
+            select(AnalysisRecord.data).where(AnalysisRecord.id == analysis_id)
+        )
+
+    async def find_recent(self, canonical_url: str, deep_scan: bool, max_age: int) -> Optional[AnalysisResult]:
+        """Latest full (not degraded) analysis of a canonical URL newer than ``max_age`` seconds"""
+        since = datetime.utcnow() - timedelta(seconds=max_age)
+        return await self._read(
+            select(AnalysisRecord.data)
+            .where(
+                AnalysisRecord.canonical_url == canonical_url,
+                AnalysisRecord.deep_scan == deep_scan,
+                AnalysisRecord.degraded.is_(False),
+                AnalysisRecord.timestamp >= since,
+            )
+            .order_by(AnalysisRecord.timestamp.desc())
+            .limit(1)
+        )
+
+    async def _read(self, statement) -> Optional[AnalysisResult]:
+        """Run a lookup of one stored result; a database error counts as a miss"""
+        try:
+            async with connection.get_session() as session:
+                data = await session.scalar(statement)
+        except (SQLAlchemyError, OSError, asyncio.TimeoutError) as e:
+            self.read_errors += 1
+            logger.error(f"Analysis store unavailable, treating lookup as a miss: {str(e)}")
+            return None
+        return AnalysisResult.model_validate_json(data) if data else None
+
+    async def flush(self):
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            rows: List[dict] = list(self._pending.values())
+            self._pending.clear()
+
+            try:
+                await self._insert(rows)
+            except Exception as e:
+                self.flush_errors += 1
+                logger.error(f"Failed to persist {len(rows)} analyses, retrying them one by one: {str(e)}")
+                await self._insert_each(rows)
+
+    async def _insert(self, rows: List[dict]):
+        async with connection.get_session() as session:
+            await session.execute(insert(AnalysisRecord), rows)
+            await session.commit()
+        self.flushed += len(rows)
+
+    async def _insert_each(self, rows: List[dict]):
+        for index, row in enumerate(rows):
+            try:
+                await self._insert([row])
+            except (IntegrityError, DataError) as e:
+                self.dropped += 1
+                logger.error(f"Dropping analysis {row['id']}, the database rejects it: {str(e)}")
+            except Exception as e:
+                logger.error(f"Failed to persist analyses, keeping {len(rows) - index} for the next flush: {str(e)}")
+                # Retry on the next flush, unless the backlog is already large
+                if len(self._pending) < self.batch_size * 10:
+                    for pending in rows[index:]:
+                        self._pending.setdefault(pending["id"], pending)
+                return
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._pending),
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+            "dropped": self.dropped,
+            "read_errors": self.read_errors,
+        }
+
+    def _remember(self, result: AnalysisResult):
+        self._recent[result.id] = result
+        self._recent.move_to_end(result.id)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+analysis_store = AnalysisStore()
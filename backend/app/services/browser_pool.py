@@ -0,0 +1,241 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Playwright
+
+logger = logging.getLogger(__name__)
+
+BROWSER_ARGS = ['--no-sandbox', '--disable-dev-shm-usage']
+
+
+class PooledBrowser:
+    """A Chromium instance owned by the pool plus its usage counters"""
+
+    def __init__(self, browser: 'Browser'):
+        self.browser = browser
+        self.pages_served = 0
+        self.active_leases = 0
+        self.retiring = False
+
+    async def memory_mb(self) -> float:
+        """Resident memory of every Chromium process behind this browser"""
+        import psutil
+
+        session = await self.browser.new_browser_cdp_session()
+        try:
+            info = await session.send('SystemInfo.getProcessInfo')
+        finally:
+            await session.detach()
+
+        total = 0
+        for process in info.get('processInfo', []):
+            try:
+                total += psutil.Process(process['id']).memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+
+class BrowserPool:
+    """Long-lived pool of Chromium browsers shared across requests.
+
+    Each lease gets a fresh, isolated ``BrowserContext``. Browsers are
+    recycled after ``max_pages`` pages or once their memory passes
+    ``max_memory_mb``, so a long-running worker does not slowly bloat.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.BROWSER_POOL_SIZE,
+        contexts_per_browser: int = settings.BROWSER_CONTEXTS_PER_BROWSER,
+        max_pages: int = settings.BROWSER_MAX_PAGES,
+        max_memory_mb: int = settings.BROWSER_MAX_MEMORY_MB,
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+
+        self.playwright: Optional['Playwright'] = None
+        self.browsers: List[PooledBrowser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = asyncio.Lock()
+        self._launching: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self.playwright is not None
+
+    @property
+    def capacity(self) -> int:
+        return self.size * self.contexts_per_browser
+
+    @property
+    def in_use(self) -> int:
+        return sum(b.active_leases for b in self.browsers)
+
+    async def start(self):
+        """Start Playwright and launch the initial browsers"""
+        if self.started or self.size <= 0:
+            return
+
+        # Imported here so the API process does not load Playwright until it needs a browser
+        from playwright.async_api import async_playwright
+
+        self.playwright = await async_playwright().start()
+        self._slots = asyncio.Semaphore(self.capacity)
+        try:
+            for _ in range(self.size):
+                self.browsers.append(await self._launch())
+        except Exception:
+            # Leave the pool stopped, so scrapers launch their own browser instead of leasing from it
+            await self.stop()
+            raise
+
+        logger.info(f"Browser pool started with {self.size} browsers ({self.capacity} contexts)")
+
+    async def stop(self):
+        """Close every browser and stop Playwright"""
+        if not self.started:
+            return
+
+        for pooled in self.browsers:
+            await self._close(pooled)
+        self.browsers = []
+
+        await self.playwright.stop()
+        self.playwright = None
+        self._slots = None
+        logger.info("Browser pool stopped")
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator['BrowserContext']:
+        """Lease an isolated browser context, returning it to the pool on exit"""
+        if not self.started:
+            raise RuntimeError("Browser pool is not started")
+
+        async with self._slots:
+            pooled = await self._acquire()
+            context = await pooled.browser.new_context(user_agent=settings.USER_AGENT)
+
+            def count_page(_page):
+                pooled.pages_served += 1
+
+            context.on('page', count_page)
+            try:
+                yield context
+            finally:
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.warning(f"Error closing browser context: {str(e)}")
+                await self._release(pooled)
+
+    def stats(self) -> Dict:
+        return {
+            'browsers': len(self.browsers),
+            'capacity': self.capacity,
+            'in_use': self.in_use,
+            'pages_served': [b.pages_served for b in self.browsers],
+        }
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self.playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        return PooledBrowser(browser)
+
+    async def _close(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {str(e)}")
+
+    async def _acquire(self) -> PooledBrowser:
+        while True:
+            async with self._lock:
+                crashed = self._retire_disconnected()
+                candidates = [b for b in self.browsers if not b.retiring]
+                if candidates:
+                    pooled = min(candidates, key=lambda b: b.active_leases)
+                    pooled.active_leases += 1
+            for dead in crashed:
+                await self._close(dead)
+            if candidates:
+                return pooled
+            # Every browser is retiring or crashed: wait for a replacement outside the lock,
+            # sharing one launch with any other lease stuck here, then pick again
+            if self._launching is None or self._launching.done():
+                self._launching = asyncio.create_task(self._launch_into_pool())
+            await asyncio.shield(self._launching)
+
+    async def _release(self, pooled: PooledBrowser):
+        async with self._lock:
+            pooled.active_leases -= 1
+
+        # The memory probe is a CDP round trip; other leases must not wait behind it
+        if not pooled.retiring and await self._should_recycle(pooled):
+            pooled.retiring = True
+
+        async with self._lock:
+            retire = pooled.retiring and pooled.active_leases == 0 and pooled in self.browsers
+            if retire:
+                self.browsers.remove(pooled)
+
+        if retire:
+            await self._close(pooled)
+            try:
+                await self._launch_into_pool()
+            except Exception as e:
+                logger.error(f"Could not launch a replacement browser: {str(e)}")
+
+    def _retire_disconnected(self) -> List[PooledBrowser]:
+        """Retire crashed browsers; the idle ones leave the list and are returned for closing"""
+        crashed = []
+        for pooled in list(self.browsers):
+            if pooled.retiring or pooled.browser.is_connected():
+                continue
+            logger.warning("Pooled browser disconnected, replacing it")
+            pooled.retiring = True
+            if pooled.active_leases == 0:
+                self.browsers.remove(pooled)
+                crashed.append(pooled)
+        return crashed
+
+    async def _launch_into_pool(self):
+        """Launch a browser without holding the lock and add it if the pool still has room"""
+        pooled = await self._launch()
+        async with self._lock:
+            serving = sum(1 for b in self.browsers if not b.retiring and b.browser.is_connected())
+            if self.started and serving < self.size:
+                self.browsers.append(pooled)
+                return
+        # The pool was stopped or refilled while this browser was starting
+        await self._close(pooled)
+
+    async def _should_recycle(self, pooled: PooledBrowser) -> bool:
+        if not pooled.browser.is_connected():
+            logger.warning("Pooled browser disconnected, replacing it")
+            return True
+
+        if self.max_pages and pooled.pages_served >= self.max_pages:
+            logger.info(f"Recycling browser after {pooled.pages_served} pages")
+            return True
+
+        if self.max_memory_mb:
+            try:
+                memory = await pooled.memory_mb()
+            except Exception as e:
+                logger.warning(f"Could not read browser memory: {str(e)}")
+                return False
+            if memory > self.max_memory_mb:
+                logger.info(f"Recycling browser using {memory:.0f}MB")
+                return True
+
+        return False
+
+
+browser_pool = BrowserPool()
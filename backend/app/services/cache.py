@@ -1,7 +1,211 @@
+from collections import OrderedDict
+import json
+import logging
+import time
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple, Type
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.analysis import AnalysisResult
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+# Payloads above this size are zlib-compressed before being stored
+COMPRESS_THRESHOLD = 1024
+
+
+class LRUCache:
+    """Bounded in-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: bytes, expire: int):
+        self._entries[key] = (time.monotonic() + expire, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class CacheService:
+    """Two-tier cache: in-process LRU in front of Redis.
+
+    When Redis is unreachable the service keeps answering from the local
+    tier and retries Redis after ``CACHE_REDIS_RETRY_SECONDS``.
+    """
+
+    _local = LRUCache(settings.CACHE_LOCAL_MAX_ENTRIES)
+    _redis: Optional['redis.Redis'] = None
+    _redis_retry_at = 0.0
+
+    _stats = {
+        'local_hits': 0,
+        'redis_hits': 0,
+        'misses': 0,
+        'sets': 0,
+        'redis_errors': 0,
+    }
+
     @staticmethod
-    async def get(key):
+    async def get(key: str, model: Optional[Type[BaseModel]] = AnalysisResult, local: bool = True) -> Any:
+        """Return the cached value for key, or None on a miss.
+
+        ``local=False`` reads Redis only, for values that change and must
+        look the same from every worker (e.g. job status).
+        """
+        payload = CacheService._local.get(key) if local else None
+        if payload is not None:
+            CacheService._stats['local_hits'] += 1
+            return CacheService._decode(payload, model)
+
+        client = CacheService.redis_client()
+        if client:
+            try:
+                payload = await client.get(key)
+            except Exception as e:
+                CacheService.report_redis_error(e)
+                payload = None
+
+            if payload is not None:
+                CacheService._stats['redis_hits'] += 1
+                if local:
+                    CacheService._local.set(key, payload, settings.CACHE_LOCAL_TTL)
+                return CacheService._decode(payload, model)
+
+        CacheService._stats['misses'] += 1
         return None
+
     @staticmethod
-    async def set(key, value, expire=3600):
-        pass 
\ No newline at end of file
+    async def set(key: str, value: Any, expire: int = 3600, local: bool = True):
+        """Store value in both tiers (Redis only with ``local=False``) for expire seconds"""
+        payload = CacheService._encode(value)
+        CacheService._stats['sets'] += 1
+        if local:
+            CacheService._local.set(key, payload, min(expire, settings.CACHE_LOCAL_TTL))
+
+        client = CacheService.redis_client()
+        if client:
+            try:
+                await client.set(key, payload, ex=expire)
+            except Exception as e:
+                CacheService.report_redis_error(e)
+
+    @staticmethod
+    async def delete(key: str):
+        CacheService._local.delete(key)
+
+        client = CacheService.redis_client()
+        if client:
+            try:
+                await client.delete(key)
+            except Exception as e:
+                CacheService.report_redis_error(e)
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        return {
+            **CacheService._stats,
+            'hits': CacheService._stats['local_hits'] + CacheService._stats['redis_hits'],
+            'evictions': CacheService._local.evictions,
+            'local_entries': len(CacheService._local),
+        }
+
+    @staticmethod
+    async def close():
+        if CacheService._redis is not None:
+            try:
+                await CacheService._redis.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing Redis connection: {str(e)}")
+            CacheService._redis = None
+
+    @staticmethod
+    def redis_client() -> Optional['redis.Redis']:
+        if not settings.CACHE_REDIS_ENABLED:
+            return None
+        if time.monotonic() < CacheService._redis_retry_at:
+            return None
+
+        if CacheService._redis is None:
+            import redis.asyncio as redis
+
+            CacheService._redis = redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+            )
+        return CacheService._redis
+
+    @staticmethod
+    async def ping() -> bool:
+        """Open the Redis connection ahead of the first request; False if it is disabled or down"""
+        client = CacheService.redis_client()
+        if client is None:
+            return False
+        try:
+            await client.ping()
+            return True
+        except Exception as e:
+            CacheService.report_redis_error(e)
+            return False
+
+    @staticmethod
+    def report_redis_error(error: Exception):
+        CacheService._stats['redis_errors'] += 1
+        CacheService._redis_retry_at = time.monotonic() + settings.CACHE_REDIS_RETRY_SECONDS
+        logger.warning(f"Redis unavailable, using local cache only: {str(error)}")
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        if isinstance(value, BaseModel):
+            data = value.model_dump_json(exclude_none=True).encode()
+        else:
+            data = json.dumps(value, separators=(',', ':'), default=str).encode()
+
+        if len(data) > COMPRESS_THRESHOLD:
+            return b'z' + zlib.compress(data)
+        return b'j' + data
+
+    @staticmethod
+    def _decode(payload: bytes, model: Optional[Type[BaseModel]]) -> Any:
+        marker, data = payload[:1], payload[1:]
+        try:
+            if marker == b'z':
+                data = zlib.decompress(data)
+
+            if model is not None:
+                return model.model_validate_json(data)
+            return json.loads(data)
+        except (ValueError, zlib.error) as e:
+            # Entries written by an older schema are treated as misses
+            logger.warning(f"Discarding unreadable cache entry: {str(e)}")
+            return None
@@ -1 +1,393 @@
-# ... existing code ... 
\ No newline at end of file
+import json
+import logging
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.models.analysis import CriteriaScore, EthicsCategory, RedFlag
+
+logger = logging.getLogger(__name__)
+
+# Each group maps phrases (Spanish and English, accents optional) to a
+# criterion. Risk groups lower that criterion and raise a red flag; groups
+# with a "bonus" are good signals and raise it. A trailing "*" matches any
+# word ending ("manipula*" matches "manipulamos", "manipulación"...).
+LEXICON: Dict[str, Dict[str, Any]] = {
+    'data_sale': {
+        'criterion': 'privacy', 'severity': 'high',
+        'description': 'Venta o cesión de datos personales a terceros',
+        'phrases': [
+            'sell your personal information', 'sell your data', 'sell personal data',
+            'sell your personal data', 'share your data with third parties',
+            'share your personal information with third parties', 'data brokers',
+            'monetize your data', 'rent your personal information',
+            'vender sus datos', 'vendemos sus datos', 'venta de datos', 'venta de sus datos',
+            'ceder sus datos a terceros', 'cesion de datos a terceros',
+            'compartir sus datos con terceros', 'compartimos sus datos con terceros',
+            'intermediarios de datos',
+        ],
+    },
+    'biometrics': {
+        'criterion': 'privacy', 'severity': 'high',
+        'description': 'Tratamiento de datos biométricos o reconocimiento facial/emocional',
+        'phrases': [
+            'facial recognition', 'face recognition', 'biometric data', 'biometric identifiers',
+            'biometric information', 'faceprint*', 'voiceprint*', 'emotion recognition',
+            'emotion detection', 'reconocimiento facial', 'datos biometricos',
+            'identificadores biometricos', 'huella dactilar', 'huellas dactilares',
+            'reconocimiento de emociones', 'deteccion de emociones',
+        ],
+    },
+    'tracking': {
+        'criterion': 'privacy', 'severity': 'medium',
+        'description': 'Rastreo del usuario entre sitios, dispositivos o ubicaciones',
+        'phrases': [
+            'cross-site tracking', 'track your activity', 'tracking pixel*', 'device fingerprinting',
+            'browser fingerprinting', 'precise location', 'precise geolocation', 'geolocation data',
+            'behavioral advertising', 'behavioural advertising', 'third-party cookies',
+            'seguimiento entre sitios', 'rastrear su actividad', 'pixeles de seguimiento',
+            'huella digital del dispositivo', 'ubicacion precisa', 'datos de geolocalizacion',
+            'publicidad comportamental', 'publicidad basada en el comportamiento',
+            'cookies de terceros',
+        ],
+    },
+    'dark_patterns': {
+        'criterion': 'transparency', 'severity': 'medium',
+        'description': 'Patrones oscuros de urgencia, renovación o cancelación',
+        'phrases': [
+            'limited time offer', 'offer ends soon', 'act now', 'only a few left',
+            'automatically renew*', 'auto-renew*', 'automatic renewal', 'non-refundable',
+            'hidden fees', 'no thanks, i',
+            'oferta por tiempo limitado', 'solo quedan', 'ultimas unidades', 'actua ahora',
+            'renovacion automatica', 'se renovara automaticamente', 'no reembolsable',
+            'no gracias, prefiero',
+        ],
+    },
+    'evasive_terms': {
+        'criterion': 'transparency', 'severity': 'medium',
+        'description': 'Términos evasivos o cambios unilaterales sin aviso',
+        'phrases': [
+            'at our sole discretion', 'in our sole discretion', 'without prior notice',
+            'without notice', 'perpetual, irrevocable', 'irrevocable license',
+            'waive your right*', 'class action waiver', 'binding arbitration',
+            'a nuestra entera discrecion', 'a nuestra sola discrecion', 'a nuestra discrecion',
+            'sin previo aviso', 'licencia perpetua', 'licencia irrevocable',
+            'renuncia a su derecho', 'renuncia al derecho',
+        ],
+    },
+    'surveillance': {
+        'criterion': 'social', 'severity': 'high',
+        'description': 'Vigilancia, suplantación o puntuación social de personas',
+        'phrases': [
+            'mass surveillance', 'predictive policing', 'employee monitoring', 'monitor your employees',
+            'social scoring', 'voice cloning', 'clone any voice', 'deepfake*', 'undetectable',
+            'bypass ai detection', 'fake reviews',
+            'vigilancia masiva', 'policia predictiva', 'monitoreo de empleados',
+            'monitorizar a los empleados', 'puntuacion social', 'clonacion de voz',
+            'indetectable', 'resenas falsas',
+        ],
+    },
+    'manipulation': {
+        'criterion': 'social', 'severity': 'medium',
+        'description': 'Diseño orientado a la adicción o la manipulación',
+        'phrases': [
+            'addictive', 'infinite scroll', 'maximize engagement', 'engagement maximization',
+            'manipulat*', 'persuasive design', 'vulnerable users',
+            'adictiv*', 'scroll infinito', 'maximizar el engagement', 'manipula*',
+            'usuarios vulnerables',
+        ],
+    },
+    'sensitive_decisions': {
+        'criterion': 'fairness', 'severity': 'medium',
+        'description': 'Decisiones automatizadas sobre personas en ámbitos sensibles',
+        'phrases': [
+            'automated hiring', 'screen candidates', 'candidate screening', 'personality assessment',
+            'predict criminality', 'credit scoring', 'tenant screening', 'sexual orientation',
+            'ethnic origin',
+            'seleccion automatizada de candidatos', 'filtrar candidatos', 'evaluacion de personalidad',
+            'predecir la criminalidad', 'puntuacion crediticia', 'orientacion sexual', 'origen etnico',
+        ],
+    },
+    'user_rights': {
+        'criterion': 'privacy', 'bonus': 1,
+        'description': 'Derechos del usuario sobre sus datos',
+        'phrases': [
+            'right to erasure', 'right to be forgotten', 'delete your data', 'data portability',
+            'opt out', 'opt-out', 'do not sell', 'we do not sell', 'we never sell', 'gdpr', 'ccpa',
+            'data protection officer',
+            'derecho al olvido', 'derecho de supresion', 'eliminar sus datos', 'portabilidad de datos',
+            'no vendemos', 'nunca vendemos', 'rgpd', 'delegado de proteccion de datos', 'derechos arco',
+        ],
+    },
+    'transparency_signals': {
+        'criterion': 'transparency', 'bonus': 1,
+        'description': 'Explicación del funcionamiento y supervisión del sistema',
+        'phrases': [
+            'model card', 'how our ai works', 'how our model works', 'transparency report',
+            'human review', 'human in the loop', 'human-in-the-loop', 'explainab*',
+            'independent audit', 'third-party audit', 'responsible ai',
+            'como funciona nuestra ia', 'informe de transparencia', 'revision humana',
+            'supervision humana', 'explicabilidad', 'auditoria independiente', 'auditoria externa',
+            'ia responsable',
+        ],
+    },
+    'fairness_signals': {
+        'criterion': 'fairness', 'bonus': 1,
+        'description': 'Medidas contra sesgos y de accesibilidad',
+        'phrases': [
+            'bias mitigation', 'bias testing', 'fairness testing', 'accessibility', 'wcag',
+            'equal opportunity',
+            'mitigacion de sesgos', 'pruebas de sesgo', 'accesibilidad', 'igualdad de oportunidades',
+            'no discriminacion',
+        ],
+    },
+    'social_signals': {
+        'criterion': 'social', 'bonus': 1,
+        'description': 'Compromisos de impacto social',
+        'phrases': [
+            'open source', 'open-source', 'nonprofit', 'non-profit', 'sustainability',
+            'codigo abierto', 'sin fines de lucro', 'sin animo de lucro', 'sostenibilidad',
+        ],
+    },
+}
+
+# Red flag criterion -> CriteriaScore field
+CRITERIA_FIELDS = {
+    'privacy': 'privacy',
+    'social': 'social_impact',
+    'transparency': 'transparency',
+    'fairness': 'fairness',
+}
+
+# Words that, right before a risk phrase, turn it into a reassurance ("we do not sell your data")
+NEGATIONS = {'not', 'never', 'no', "don't", "doesn't", "won't", 'without', 'nunca', 'jamas', 'tampoco', 'ni'}
+
+BASELINE_SCORE = 6
+SEVERITY_PENALTY = {'low': 1, 'medium': 2, 'high': 3}
+EVIDENCE_CONTEXT = 80
+
+# Accent folding that keeps string length, so match offsets index the original text
+_FOLD_TABLE = {
+    cp: unicodedata.normalize('NFKD', chr(cp))[0].lower()
+    for cp in range(0xC0, 0x180)
+    if unicodedata.normalize('NFKD', chr(cp))[0] != chr(cp)
+}
+
+
+def fold(text: str) -> str:
+    return text.translate(_FOLD_TABLE).lower()
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every phrase in one pass over the text"""
+
+    def __init__(self, patterns: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self.patterns = patterns
+
+        for index, pattern in enumerate(patterns):
+            node = 0
+            for char in pattern:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = next_node
+            self._out[node].append(index)
+
+        # Breadth-first failure links; outputs inherit those of their fallback
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, pattern_index)`` for every occurrence"""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                yield position - len(patterns[index]) + 1, index
+
+
+class ScreenResult:
+    """Provisional verdict from the local engine"""
+
+    def __init__(self, criteria_scores: CriteriaScore, red_flags: List[RedFlag],
+                 detected_patterns: List[str], signals: List[str], confidence: float):
+        self.criteria_scores = criteria_scores
+        self.red_flags = red_flags
+        self.detected_patterns = detected_patterns
+        self.signals = signals
+        self.confidence = confidence
+
+        scores = criteria_scores.model_dump()
+        self.overall_score = round(sum(scores.values()) / len(scores) * 10)
+        if self.overall_score >= 70:
+            self.category = EthicsCategory.ETHICAL
+        elif self.overall_score >= 40:
+            self.category = EthicsCategory.WARNING
+        else:
+            self.category = EthicsCategory.DANGER
+
+    @property
+    def clear_cut(self) -> bool:
+        """Unambiguously harmful: several independent high-severity risks.
+
+        Only the negative side is decided locally; the absence of red
+        phrases is not evidence enough to call a site ethical.
+        """
+        high = sum(1 for flag in self.red_flags if flag.severity == 'high')
+        return high >= 2 and self.category == EthicsCategory.DANGER
+
+    def to_analysis(self, scraped_data: Dict) -> Dict[str, Any]:
+        """Same shape as AIAnalyzer._structure_analysis"""
+        return {
+            "overall_score": self.overall_score,
+            "category": self.category,
+            "title": "Análisis Preliminar",
+            "justification": (
+                f"Evaluación preliminar basada en reglas locales: se detectaron {len(self.red_flags)} "
+                f"señales de riesgo y {len(self.signals)} señales positivas en el contenido analizado. "
+                "Se recomienda un análisis completo para confirmar el resultado."
+            ),
+            "criteria_scores": self.criteria_scores,
+            "red_flags": list(self.red_flags),
+            "detected_patterns": list(self.detected_patterns),
+            "ai_confidence": self.confidence,
+            "pages_analyzed": scraped_data.get("pages_analyzed", 1),
+            "content_length": scraped_data.get("content_length", 0)
+        }
+
+
+class EthicsEngine:
+    """Deterministic pre-screen of scraped pages against the lexicon"""
+
+    def __init__(self, lexicon: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.lexicon = lexicon if lexicon is not None else load_lexicon()
+
+        self._entries: List[Tuple[str, bool]] = []  # (group, prefix match)
+        patterns = []
+        for name, group in self.lexicon.items():
+            for phrase in group['phrases']:
+                prefix = phrase.endswith('*')
+                patterns.append(fold(phrase.rstrip('*')))
+                self._entries.append((name, prefix))
+        self.matcher = AhoCorasick(patterns)
+
+    def screen(self, scraped_data: Dict) -> ScreenResult:
+        matches: Dict[str, List[str]] = {}
+        evidence: Dict[str, str] = {}
+
+        for source, text in self._sources(scraped_data):
+            folded = fold(text)
+            for start, index in self.matcher.search(folded):
+                group, prefix = self._entries[index]
+                phrase = self.matcher.patterns[index]
+                end = start + len(phrase)
+                if not self._at_word_boundary(folded, start, end, prefix):
+                    continue
+                if 'severity' in self.lexicon[group] and self._negated(folded, start):
+                    continue
+
+                found = matches.setdefault(group, [])
+                if phrase not in found:
+                    found.append(phrase)
+                if group not in evidence:
+                    evidence[group] = self._evidence(text, start, end, source)
+
+        scores = {field: BASELINE_SCORE for field in CRITERIA_FIELDS.values()}
+        red_flags = []
+        signals = []
+        for group, phrases in matches.items():
+            rule = self.lexicon[group]
+            field = CRITERIA_FIELDS[rule['criterion']]
+            # A third distinct phrase in the same group counts as corroboration
+            extra = 1 if len(phrases) >= 3 else 0
+            if 'severity' in rule:
+                scores[field] -= SEVERITY_PENALTY[rule['severity']] + extra
+                red_flags.append(RedFlag(
+                    severity=rule['severity'],
+                    category=rule['criterion'],
+                    description=rule['description'],
+                    evidence=evidence[group],
+                ))
+            else:
+                scores[field] += rule.get('bonus', 1) + extra
+                signals.append(group)
+
+        criteria = CriteriaScore(**{field: max(0, min(10, score)) for field, score in scores.items()})
+
+        distinct = sum(len(phrases) for phrases in matches.values())
+        confidence = 0.1 if not scraped_data.get('content') else min(0.6, 0.3 + 0.05 * distinct)
+
+        return ScreenResult(
+            criteria_scores=criteria,
+            red_flags=red_flags,
+            detected_patterns=[group for group in matches if group not in signals],
+            signals=signals,
+            confidence=round(confidence, 2),
+        )
+
+    def _sources(self, scraped_data: Dict) -> Iterator[Tuple[str, str]]:
+        yield 'title', scraped_data.get('title') or ''
+        yield 'main', scraped_data.get('content') or ''
+        for key, value in (scraped_data.get('additional_content') or {}).items():
+            yield key.replace('_content', ''), value or ''
+
+    @staticmethod
+    def _at_word_boundary(text: str, start: int, end: int, prefix: bool) -> bool:
+        if start > 0 and text[start - 1].isalnum():
+            return False
+        return prefix or end >= len(text) or not text[end].isalnum()
+
+    @staticmethod
+    def _negated(text: str, start: int) -> bool:
+        words = text[max(0, start - 30):start].split()[-3:]
+        return any(word.strip('.,;:()') in NEGATIONS for word in words)
+
+    @staticmethod
+    def _evidence(text: str, start: int, end: int, source: str) -> str:
+        snippet = ' '.join(text[max(0, start - EVIDENCE_CONTEXT):end + EVIDENCE_CONTEXT].split())
+        return f"[{source}] …{snippet}…"
+
+
+def load_lexicon(path: str = settings.ETHICS_LEXICON_PATH) -> Dict[str, Dict[str, Any]]:
+    """Built-in lexicon, extended with groups/phrases from a JSON file if configured"""
+    lexicon = {name: {**group, 'phrases': list(group['phrases'])} for name, group in LEXICON.items()}
+    if not path:
+        return lexicon
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            extra = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load ethics lexicon {path}: {str(e)}")
+        return lexicon
+
+    for name, group in extra.items():
+        if name in lexicon:
+            lexicon[name]['phrases'].extend(group.get('phrases', []))
+        elif group.get('criterion') in CRITERIA_FIELDS and group.get('phrases'):
+            lexicon[name] = group
+        else:
+            logger.warning(f"Ignoring lexicon group {name}: needs a known criterion and phrases")
+    return lexicon
+
+
+ethics_engine = EthicsEngine()
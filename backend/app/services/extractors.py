@@ -0,0 +1,180 @@
+import logging
+import re
+from typing import Dict, List
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    lxml = None
+
+# Maximum characters of text kept per page
+MAX_TEXT_LENGTH = 50000
+
+# lxml refuses str input that declares an encoding (common on XHTML pages); the text is already decoded
+XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>', re.IGNORECASE)
+
+# Subtrees whose text is not page content (their links are still collected)
+SKIPPED_TEXT_TAGS = {'script', 'style', 'nav', 'footer'}
+
+IMPORTANT_LINK_KEYWORDS = [
+    'privacy', 'terms', 'about', 'contact', 'policy',
+    'privacidad', 'terminos', 'términos', 'condiciones', 'acerca', 'nosotros', 'legal'
+]
+
+
+def is_important_link(href: str, text: str) -> bool:
+    href = href.lower()
+    return any(keyword in href or keyword in text for keyword in IMPORTANT_LINK_KEYWORDS)
+
+
+class BaseExtractor:
+    """Turns raw HTML into ``{'title', 'content', 'metadata'}``"""
+
+    name = 'base'
+
+    def extract(self, html: str, include_metadata: bool = True) -> Dict:
+        raise NotImplementedError
+
+
+class Bs4Extractor(BaseExtractor):
+    """Reference extractor built on BeautifulSoup's html.parser"""
+
+    name = 'bs4'
+
+    def extract(self, html: str, include_metadata: bool = True) -> Dict:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+        title = soup.title.get_text().strip() if soup.title else ''
+
+        # Extract metadata first: text extraction drops nav and footer links
+        metadata = self._extract_metadata(soup) if include_metadata else {}
+
+        return {
+            'title': title,
+            'content': self._extract_text_content(soup),
+            'metadata': metadata,
+        }
+
+    def _extract_text_content(self, soup) -> str:
+        """Extract clean text content from HTML"""
+        # Remove script and style elements
+        for script in soup(list(SKIPPED_TEXT_TAGS)):
+            script.decompose()
+
+        # Get text and clean it
+        text = soup.get_text()
+        lines = (line.strip() for line in text.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        text = ' '.join(chunk for chunk in chunks if chunk)
+
+        return text[:MAX_TEXT_LENGTH]  # Limit content length
+
+    def _extract_metadata(self, soup) -> Dict:
+        """Extract metadata from HTML"""
+        metadata = {}
+
+        # Meta tags
+        for tag in soup.find_all('meta'):
+            name = tag.get('name') or tag.get('property')
+            content = tag.get('content')
+            if name and content:
+                metadata[name] = content
+
+        # Links to important pages
+        important_links = []
+        for link in soup.find_all('a', href=True):
+            text = link.get_text().lower().strip()
+            if is_important_link(link['href'], text):
+                important_links.append({
+                    'text': text,
+                    'href': link['href']
+                })
+
+        metadata['important_links'] = important_links
+        return metadata
+
+
+class LxmlExtractor(BaseExtractor):
+    """Single-pass extractor on lxml's C parser.
+
+    One walk over the tree collects text, meta tags and important links,
+    without mutating the document, so footer and nav links are kept for
+    metadata while their text is left out of the content.
+    """
+
+    name = 'lxml'
+
+    def extract(self, html: str, include_metadata: bool = True) -> Dict:
+        try:
+            root = lxml.html.document_fromstring(XML_DECLARATION.sub('', html, count=1))
+        except (etree.ParserError, ValueError) as e:
+            logger.warning(f"lxml could not parse the page, using bs4: {str(e)}")
+            return Bs4Extractor().extract(html, include_metadata)
+
+        parts: List[str] = []
+        metadata: Dict = {}
+        important_links: List[Dict] = []
+        title = ''
+        skip_depth = 0
+
+        for event, element in etree.iterwalk(root, events=('start', 'end')):
+            tag = element.tag
+            if not isinstance(tag, str):
+                # Comments and processing instructions: only their tail is content
+                if event == 'end' and element.tail and not skip_depth:
+                    parts.append(element.tail)
+                continue
+
+            if event == 'start':
+                if tag in SKIPPED_TEXT_TAGS:
+                    skip_depth += 1
+                elif element.text and not skip_depth:
+                    parts.append(element.text)
+
+                if tag == 'title' and not title:
+                    title = element.text_content().strip()
+                elif include_metadata and tag == 'meta':
+                    name = element.get('name') or element.get('property')
+                    content = element.get('content')
+                    if name and content:
+                        metadata[name] = content
+                elif include_metadata and tag == 'a':
+                    href = element.get('href')
+                    if href is not None:
+                        text = element.text_content().lower().strip()
+                        if is_important_link(href, text):
+                            important_links.append({'text': text, 'href': href})
+            else:
+                if tag in SKIPPED_TEXT_TAGS:
+                    skip_depth -= 1
+                if element.tail and not skip_depth:
+                    parts.append(element.tail)
+
+        if include_metadata:
+            metadata['important_links'] = important_links
+
+        return {
+            'title': title,
+            'content': ' '.join(''.join(parts).split())[:MAX_TEXT_LENGTH],
+            'metadata': metadata,
+        }
+
+
+EXTRACTORS = {
+    Bs4Extractor.name: Bs4Extractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name: str = settings.SCRAPER_EXTRACTOR) -> BaseExtractor:
+    """Return the configured extractor, falling back to bs4 without lxml"""
+    if name == LxmlExtractor.name and lxml is None:
+        logger.warning("lxml is not installed, using the bs4 extractor")
+        name = Bs4Extractor.name
+    return EXTRACTORS[name]()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.config import settings
+from app.models.analysis import AnalysisResponse, AnalysisResult, JobStatus
+from app.services.analysis_service import analyze_url
+from app.services.cache import CacheService
+from app.services import progress, tracing
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds between status reads when following a job that runs on another worker
+SHARED_POLL_INTERVAL = 1.0
+
+
+class QueueFullError(Exception):
+    """Raised when the analysis queue cannot accept more jobs"""
+
+
+def job_status_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+class AnalysisJob:
+    def __init__(self, url: str, deep_scan: bool, trace_mode: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.url = url
+        self.deep_scan = deep_scan
+        # Requested tracing ("trace" or "profile"); the trace ID is derived from the job ID
+        self.trace_mode = trace_mode
+        self.trace_id = uuid.UUID(self.id).hex
+        self.status = JobStatus.QUEUED
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[AnalysisResult] = None
+        self.error: Optional[str] = None
+
+    def to_response(self) -> AnalysisResponse:
+        return AnalysisResponse(
+            success=self.status != JobStatus.FAILED,
+            data=self.result,
+            error=self.error,
+            analysis_id=self.id,
+            status=self.status
+        )
+
+
+class AnalysisJobQueue:
+    """Bounded queue of analyses processed by a fixed-size worker pool.
+
+    At most ``workers`` analyses run at once (``MAX_CONCURRENT_ANALYSES``);
+    once ``max_size`` jobs are waiting, new submissions are rejected so
+    callers get backpressure instead of piling up browsers.
+
+    Jobs live in the worker that accepted them; each status change is also
+    published to Redis so the other workers of the API can answer status
+    and progress requests for it.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.MAX_CONCURRENT_ANALYSES,
+        max_size: int = settings.ANALYSIS_QUEUE_MAX_SIZE,
+        retention: int = settings.ANALYSIS_JOB_RETENTION,
+    ):
+        self.workers = workers
+        self.max_size = max_size
+        self.retention = retention
+        self.jobs: Dict[str, AnalysisJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.running = 0
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def start(self):
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Analysis queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, url: str, deep_scan: bool = False, trace_mode: Optional[str] = None) -> AnalysisJob:
+        """Enqueue an analysis and return its job immediately"""
+        if not self.started:
+            raise RuntimeError("Analysis queue is not started")
+
+        self._prune()
+        job = AnalysisJob(url, deep_scan, trace_mode)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Analysis queue is full ({self.max_size} jobs waiting)")
+
+        self.jobs[job.id] = job
+        progress.create_tracker(job.id).emit('queued', position=self._queue.qsize())
+        await self._publish(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self.jobs.get(job_id)
+
+    async def status(self, job_id: str) -> Optional[AnalysisResponse]:
+        """Status of a job accepted by this worker or, through Redis, by another one"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_response()
+        return await CacheService.get(job_status_key(job_id), model=AnalysisResponse, local=False)
+
+    async def follow_shared(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Progress events for a job on another worker: only its status changes are shared"""
+        last = None
+        while True:
+            response = await CacheService.get(job_status_key(job_id), model=AnalysisResponse, local=False)
+            if response is None:
+                return
+            if response.status != last:
+                last = response.status
+                if response.status == JobStatus.FAILED:
+                    yield {'event': 'failed', 'error': response.error}
+                elif response.status == JobStatus.DONE:
+                    yield {'event': 'done', 'analysis_time': response.data.analysis_time if response.data else None}
+                else:
+                    yield {'event': response.status.value}
+            if response.status in (JobStatus.DONE, JobStatus.FAILED):
+                return
+            await asyncio.sleep(SHARED_POLL_INTERVAL)
+
+    async def _publish(self, job: AnalysisJob):
+        await CacheService.set(job_status_key(job.id), job.to_response(), expire=self.retention, local=False)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            self.running += 1
+            try:
+                await self._publish(job)
+                with progress.use_tracker(progress.get_tracker(job.id)):
+                    async with tracing.traced('analysis_job', job.trace_mode, trace_id=job.trace_id,
+                                              url=job.url, deep_scan=job.deep_scan):
+                        await self._run(job)
+                await self._publish(job)
+            finally:
+                self.running -= 1
+                job.finished_at = time.monotonic()
+                self._queue.task_done()
+
+    async def _run(self, job: AnalysisJob):
+        progress.emit('running')
+        try:
+            job.result, _ = await analyze_url(job.url, job.deep_scan, analysis_id=job.id)
+            job.status = JobStatus.DONE
+        except Exception as e:
+            logger.error(f"Analysis job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            progress.emit('failed', error=job.error)
+            return
+
+        tracker = progress.current_tracker()
+        progress.emit(
+            'done',
+            analysis_time=job.result.analysis_time,
+            timings=tracker.timings_ms() if tracker else {}
+        )
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.monotonic() - self.retention
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.finished_at is not None and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
+            progress.discard_tracker(job_id)
+
+
+job_queue = AnalysisJobQueue()
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+from typing import Dict, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Marks the start of the page content in the full prompt
+CONTENT_MARKER = "Contenido a analizar:\n"
+
+
+def provider_errors():
+    """``google.api_core.exceptions``, imported on first use since it pulls in protobuf"""
+    from google.api_core import exceptions
+
+    return exceptions
+
+
+class LLMProvider:
+    """Turns a full prompt into the model's raw (JSON) text response"""
+
+    name = 'base'
+
+    async def generate(self, prompt: str, model: str) -> str:
+        raise NotImplementedError
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini in JSON mode; one GenerativeModel per model name"""
+
+    name = 'gemini'
+
+    def __init__(self, api_key: str):
+        # Imported here so offline runs with the fake provider never load the SDK
+        import google.generativeai as genai
+
+        self._genai = genai
+        genai.configure(api_key=api_key)
+        self._models: Dict[str, object] = {}
+
+    async def generate(self, prompt: str, model: str) -> str:
+        client = self._models.get(model)
+        if client is None:
+            client = self._models[model] = self._genai.GenerativeModel(model)
+
+        response = await client.generate_content_async(
+            prompt,
+            generation_config=self._genai.types.GenerationConfig(
+                temperature=0.1,
+                response_mime_type="application/json",
+            )
+        )
+        return response.text
+
+
+class FakeProvider(LLMProvider):
+    """Offline stand-in for load tests and benchmarks.
+
+    Answers with schema-valid JSON derived from the local rule engine, so
+    the same content always gets the same verdict. Latency is ``latency``
+    seconds plus up to ``jitter``; a fraction ``error_rate`` of calls fail
+    with ``error_kind``: "unavailable" (503), "rate_limit" (429) or
+    "invalid_json". Error injection uses a seeded RNG, so a run is
+    reproducible while retries of the same prompt can still succeed.
+    """
+
+    name = 'fake'
+
+    ERRORS = {
+        'unavailable': 'ServiceUnavailable',
+        'rate_limit': 'ResourceExhausted',
+    }
+
+    def __init__(
+        self,
+        latency: float = settings.LLM_FAKE_LATENCY,
+        jitter: float = settings.LLM_FAKE_JITTER,
+        error_rate: float = settings.LLM_FAKE_ERROR_RATE,
+        error_kind: str = settings.LLM_FAKE_ERROR_KIND,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self._errors = random.Random(seed)
+
+    async def generate(self, prompt: str, model: str) -> str:
+        # Local import: the engine is only needed when the fake is in use
+        from app.services.ethics_engine import ethics_engine
+
+        content = prompt.split(CONTENT_MARKER, 1)[-1]
+        digest = hashlib.sha256(content.encode()).digest()
+        jitter = self.jitter * digest[0] / 255
+        await asyncio.sleep(self.latency + jitter)
+
+        if self.error_rate and self._errors.random() < self.error_rate:
+            if self.error_kind == 'invalid_json':
+                return "Lo siento, no puedo responder en JSON."
+            error = getattr(provider_errors(), self.ERRORS.get(self.error_kind, 'ServiceUnavailable'))
+            raise error(
+                f"Injected {self.error_kind} error from fake provider"
+            )
+
+        screen = ethics_engine.screen({'content': content})
+        return json.dumps({
+            "overall_score": screen.overall_score,
+            "category": screen.category.value,
+            "title": "Análisis simulado",
+            "justification": f"Respuesta simulada por el proveedor local ({model}).",
+            "criteria_scores": screen.criteria_scores.model_dump(),
+            "red_flags": [flag.model_dump() for flag in screen.red_flags],
+            "detected_patterns": screen.detected_patterns,
+            "confidence": screen.confidence,
+        }, ensure_ascii=False)
+
+
+def create_provider(name: str = settings.LLM_PROVIDER) -> Optional[LLMProvider]:
+    """The configured provider, or None if it cannot be used (e.g. no API key)"""
+    if name == FakeProvider.name:
+        return FakeProvider()
+    if name == GeminiProvider.name:
+        return GeminiProvider(settings.GOOGLE_API_KEY) if settings.GOOGLE_API_KEY else None
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+def model_for(deep_scan: bool) -> str:
+    """Model tier for a request: the fast model for quick scans, the strong one for deep scans"""
+    return settings.LLM_MODEL_DEEP if deep_scan else settings.LLM_MODEL_QUICK
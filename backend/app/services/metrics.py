@@ -0,0 +1,92 @@
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.services import progress
+from app.services.cache import CacheService
+from app.utils.loop_monitor import loop_monitor
+
+# From sub-10ms parsing up to slow LLM calls and full deep scans
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+STAGE_DURATION = Histogram(
+    'ethics_stage_duration_seconds',
+    'Time spent in each analysis pipeline stage',
+    ['stage'],
+    buckets=DURATION_BUCKETS,
+)
+ANALYSIS_DURATION = Histogram(
+    'ethics_analysis_duration_seconds',
+    'End-to-end time of analyses that ran the pipeline (not served from cache)',
+    ['deep_scan'],
+    buckets=DURATION_BUCKETS,
+)
+
+CACHE_HITS = Counter(
+    'ethics_cache_hits_total',
+    'Analyses or LLM responses reused instead of recomputed',
+    ['layer'],  # analysis, store, shared (in-flight analysis), llm
+)
+FALLBACK_ANALYSES = Counter(
+    'ethics_fallback_analyses_total',
+    'Analyses answered by the local rule engine because the LLM result was unusable',
+    ['reason'],  # llm_unavailable, invalid_json, structure_error
+)
+PAGES_FETCHED = Counter(
+    'ethics_pages_fetched_total',
+    'Pages scraped, by the path that served them',
+    ['via'],  # http, browser
+)
+SCRAPE_FAILURES = Counter('ethics_scrape_failures_total', 'Main-page scrapes that failed')
+RATE_LIMITED = Counter('ethics_rate_limited_total', 'Analysis requests rejected with 429')
+JSON_PARSE_FAILURES = Counter('ethics_llm_json_parse_failures_total', 'LLM responses that were not valid JSON')
+
+ANALYSES_IN_FLIGHT = Gauge('ethics_analyses_in_flight', 'Analyses currently being scraped or analyzed')
+BROWSER_CONTEXTS_IN_USE = Gauge('ethics_browser_contexts_in_use', 'Leased browser contexts')
+BROWSER_CONTEXTS_CAPACITY = Gauge('ethics_browser_contexts_capacity', 'Browser contexts the pool can lease at once')
+EVENT_LOOP_LAG = Gauge('ethics_event_loop_lag_seconds', 'Latest measured event loop lag')
+
+EVENT_LOOP_LAG.set_function(lambda: loop_monitor.last_lag)
+
+
+class CacheCollector:
+    """Exports CacheService's own counters when /metrics is scraped"""
+
+    def collect(self):
+        stats = CacheService.stats()
+        lookups = CounterMetricFamily(
+            'ethics_cache_lookups', 'CacheService lookups by outcome', labels=['result'],
+        )
+        for result in ('local_hits', 'redis_hits', 'misses'):
+            lookups.add_metric([result], stats[result])
+        yield lookups
+        yield CounterMetricFamily(
+            'ethics_cache_local_evictions', 'Entries pushed out of the local LRU', value=stats['evictions'],
+        )
+        yield CounterMetricFamily(
+            'ethics_cache_redis_errors', 'Redis calls that failed', value=stats['redis_errors'],
+        )
+        yield GaugeMetricFamily(
+            'ethics_cache_local_entries', 'Entries held in the local LRU', value=stats['local_entries'],
+        )
+
+
+REGISTRY.register(CacheCollector())
+
+
+def watch_browser_pool(pool):
+    """Report the pool's occupancy; registered by the app so this module does not import Playwright"""
+    BROWSER_CONTEXTS_IN_USE.set_function(lambda: pool.in_use)
+    BROWSER_CONTEXTS_CAPACITY.set_function(lambda: pool.capacity if pool.started else 0)
+
+
+def observe_stage(stage_name: str, duration: float):
+    STAGE_DURATION.labels(stage=stage_name).observe(duration)
+
+
+progress.add_stage_listener(observe_stage)
+
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    return generate_latest()
+
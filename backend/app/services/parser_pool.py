@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from app.config import settings
+from app.services.extractors import get_extractor
+
+logger = logging.getLogger(__name__)
+
+_worker_extractors = {}
+
+
+def _extract_job(extractor_name: str, html: str, include_metadata: bool) -> Dict:
+    """Runs inside a pool worker; extractors are reused across jobs"""
+    extractor = _worker_extractors.get(extractor_name)
+    if extractor is None:
+        extractor = _worker_extractors[extractor_name] = get_extractor(extractor_name)
+    return extractor.extract(html, include_metadata)
+
+
+class ParserPool:
+    """Runs HTML extraction off the event loop.
+
+    ``process`` mode uses a process pool so large pages never hold the GIL
+    of the API worker; ``thread`` mode suits parsers that release the GIL;
+    ``inline`` parses on the event loop as before. At most ``max_pending``
+    pages are queued or parsing at once; further callers wait their turn.
+    """
+
+    def __init__(
+        self,
+        mode: str = settings.PARSER_EXECUTOR,
+        workers: int = settings.PARSER_WORKERS,
+        max_pending: int = settings.PARSER_MAX_PENDING,
+        extractor_name: str = settings.SCRAPER_EXTRACTOR,
+    ):
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max_pending
+        self.extractor_name = extractor_name
+        self.executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.pending = 0
+
+    def start(self):
+        if self.executor is not None or self.mode == 'inline':
+            return
+
+        if self.mode == 'process':
+            # spawn: forking a process that runs an event loop and browser threads is unsafe
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='parser')
+        self._slots = asyncio.Semaphore(self.max_pending)
+        logger.info(f"Parser pool started ({self.mode}, {self.workers} workers)")
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            self._slots = None
+
+    def _restart(self):
+        broken, self.executor = self.executor, None
+        if broken is not None:
+            broken.shutdown(wait=False, cancel_futures=True)
+        slots = self._slots
+        self.start()
+        # Keep the semaphore so callers already waiting on it are not lost
+        self._slots = slots
+
+    async def warmup(self):
+        """Spawn the workers and load the extractor in each, so the first real pages do not pay for it"""
+        html = '<html><head><title></title></head><body><p></p></body></html>'
+        await asyncio.gather(*(self.extract(html) for _ in range(self.workers if self.executor else 1)))
+
+    async def extract(self, html: str, include_metadata: bool = True) -> Dict:
+        if self.executor is None:
+            return _extract_job(self.extractor_name, html, include_metadata)
+
+        async with self._slots:
+            self.pending += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self.executor, _extract_job, self.extractor_name, html, include_metadata
+                )
+            except BrokenExecutor as e:
+                # A crashed worker poisons the whole pool; recreate it and parse this page inline
+                logger.error(f"Parser pool broken, restarting: {str(e)}")
+                self._restart()
+                return _extract_job(self.extractor_name, html, include_metadata)
+            finally:
+                self.pending -= 1
+
+
+parser_pool = ParserPool()
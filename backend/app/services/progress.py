@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from app.services import tracing
+
+logger = logging.getLogger(__name__)
+
+FINAL_EVENTS = ('done', 'failed')
+
+
+class ProgressTracker:
+    """Stage events and timings for one analysis, replayable to late subscribers"""
+
+    def __init__(self, analysis_id: str):
+        self.analysis_id = analysis_id
+        self.started = time.monotonic()
+        self.events: List[Dict[str, Any]] = []
+        self.timings: Dict[str, float] = {}
+        self.finished = False
+        self._subscribers: List[asyncio.Queue] = []
+
+    def emit(self, event: str, **data):
+        if self.finished:
+            return
+
+        payload = {
+            'event': event,
+            'elapsed_ms': round((time.monotonic() - self.started) * 1000),
+            **data,
+        }
+        self.events.append(payload)
+        for queue in self._subscribers:
+            queue.put_nowait(payload)
+
+        if event in FINAL_EVENTS:
+            self.finished = True
+
+    def record(self, stage_name: str, duration: float):
+        self.timings[stage_name] = self.timings.get(stage_name, 0.0) + duration
+
+    def timings_ms(self) -> Dict[str, int]:
+        return {name: round(duration * 1000) for name, duration in self.timings.items()}
+
+    async def subscribe(self, heartbeat: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield past events, then live ones until the analysis finishes.
+
+        With ``heartbeat`` set, yields None after that many idle seconds so
+        callers can keep the connection alive.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for payload in self.events:
+            queue.put_nowait(payload)
+        if not self.finished:
+            self._subscribers.append(queue)
+
+        try:
+            while True:
+                if self.finished and queue.empty():
+                    return
+                try:
+                    payload = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield payload
+                if payload['event'] in FINAL_EVENTS:
+                    return
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+
+_current_tracker: ContextVar[Optional[ProgressTracker]] = ContextVar('progress_tracker', default=None)
+trackers: Dict[str, ProgressTracker] = {}
+_current_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar('stage_timings', default=None)
+# Called with (stage name, seconds) for every timed stage, tracked or not
+_stage_listeners: List[Callable[[str, float], None]] = []
+
+
+def create_tracker(analysis_id: str) -> ProgressTracker:
+    tracker = ProgressTracker(analysis_id)
+    trackers[analysis_id] = tracker
+    return tracker
+
+
+def get_tracker(analysis_id: str) -> Optional[ProgressTracker]:
+    return trackers.get(analysis_id)
+
+
+def discard_tracker(analysis_id: str):
+    trackers.pop(analysis_id, None)
+
+
+def current_tracker() -> Optional[ProgressTracker]:
+    return _current_tracker.get()
+
+
+@contextmanager
+def use_tracker(tracker: Optional[ProgressTracker]) -> Iterator[Optional[ProgressTracker]]:
+    """Make tracker the destination of emit() and stage() in this context"""
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Sum the seconds spent per stage in this context, including tasks it starts"""
+    timings: Dict[str, float] = {}
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def add_stage_listener(listener: Callable[[str, float], None]):
+    """Receive the duration of every stage in this process, e.g. for metrics or benchmarks"""
+    _stage_listeners.append(listener)
+
+
+def remove_stage_listener(listener: Callable[[str, float], None]):
+    if listener in _stage_listeners:
+        _stage_listeners.remove(listener)
+
+
+def emit(event: str, **data):
+    """Report a progress event for the current analysis, if any is tracked"""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.emit(event, **data)
+
+
+@contextmanager
+def stage(name: str, event: Optional[str] = None, **data) -> Iterator[Dict[str, Any]]:
+    """Time a pipeline stage and emit ``event`` if it completes successfully.
+
+    The yielded dict can be filled with extra fields for the event. In a
+    traced analysis the stage is also a span, with those fields as attributes.
+    """
+    info = dict(data)
+    with tracing.span(name) as trace_span:
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            yield info
+            succeeded = True
+        finally:
+            duration = time.perf_counter() - start
+            if trace_span is not None:
+                trace_span.attrs.update(info)
+            _finish_stage(name, event, info, duration, succeeded)
+
+
+def record_stage(name: str, duration: float):
+    """Account for a stage timed elsewhere (e.g. in a scrape worker) as if it ran here"""
+    _finish_stage(name, None, {}, duration, True)
+
+
+def _finish_stage(name: str, event: Optional[str], info: Dict[str, Any], duration: float, succeeded: bool):
+    for listener in _stage_listeners:
+        try:
+            listener(name, duration)
+        except Exception as e:
+            logger.warning(f"Stage listener failed for {name}: {str(e)}")
+    timings = _current_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + duration
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(name, duration)
+        if event and succeeded:
+            tracker.emit(event, duration_ms=round(duration * 1000), **info)
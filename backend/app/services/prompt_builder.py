@@ -0,0 +1,195 @@
+import json
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.ethics_engine import AhoCorasick, ethics_engine, fold
+
+logger = logging.getLogger(__name__)
+
+# Stems that make a passage worth sending to the LLM, with their weight.
+# Matched as word prefixes on accent-folded text.
+RELEVANCE_TERMS: Dict[str, float] = {
+    # Personal data and privacy
+    'personal data': 3, 'personal information': 3, 'datos personales': 3, 'informacion personal': 3,
+    'privacy': 2, 'privacidad': 2, 'cookie': 1, 'consent': 2, 'consentimiento': 2,
+    'locat': 1, 'ubicacion': 1, 'children': 2, 'menores': 2, 'biometr': 3, 'sensitive': 2, 'sensible': 2,
+    # Sharing and selling
+    'third part': 3, 'tercer': 3, 'share': 2, 'compart': 2, 'sell': 3, 'sale': 2, 'vend': 3, 'venta': 3,
+    'advertis': 2, 'publicidad': 2, 'partner': 1, 'socio': 1, 'transfer': 2,
+    # Retention and control
+    'retain': 3, 'retention': 3, 'conserva': 3, 'delet': 2, 'elimin': 2, 'opt out': 2, 'opt-out': 2,
+    'right to': 2, 'derecho': 2, 'encrypt': 1, 'cifr': 1, 'secur': 1, 'segur': 1,
+    # AI and automated decisions
+    'artificial intelligence': 2, 'inteligencia artificial': 2, 'machine learning': 2, 'algorithm': 2,
+    'algoritm': 2, 'automated': 3, 'automatizad': 3, 'model': 1, 'modelo': 1, 'training': 2,
+    'entrenamiento': 2, 'entrena': 2, 'profil': 2, 'perfil': 2, 'bias': 3, 'sesgo': 3, 'decision': 2,
+    'human review': 2, 'revision humana': 2,
+    # Terms
+    'liabil': 1, 'responsabilidad': 1, 'discretion': 2, 'discrecion': 2, 'terminat': 1, 'arbitrat': 2,
+}
+
+# Metadata keys worth keeping; the rest (viewport, theme-color, verification tokens...) is noise
+METADATA_KEYS = ('description', 'og:description', 'og:title', 'keywords', 'og:site_name', 'twitter:description')
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])\s+(?=[^\s])')
+MAX_PASSAGE_CHARS = 600
+MIN_PASSAGE_CHARS = 25
+INTRO_SHARE = 0.15  # of the budget, always spent on the opening of the main page
+METADATA_SHARE = 0.1
+LEXICON_HIT_WEIGHT = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for Latin text)"""
+    return len(text) // 4 + 1
+
+
+class Passage:
+    def __init__(self, section: str, position: int, text: str):
+        self.section = section
+        self.position = position
+        self.text = text
+        self.tokens = estimate_tokens(text)
+        self.score = 0.0
+
+
+class PromptBuilder:
+    """Packs the most ethics-relevant passages of a scrape into a token budget.
+
+    Pages are split into sentence-sized passages; passages repeated across
+    pages (cookie banners, footers, navigation) are kept once. The opening
+    of the main page is always included so the model knows what the
+    product is; the rest of the budget goes to passages ranked by
+    relevance per token, which are then put back in page order.
+    """
+
+    def __init__(self, token_budget: int = settings.PROMPT_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self._terms = list(RELEVANCE_TERMS)
+        self._matcher = AhoCorasick([fold(term) for term in self._terms])
+
+    def build(self, scraped_data: Dict) -> str:
+        header = [
+            f"Website: {scraped_data.get('url', 'Unknown')}",
+            f"Title: {scraped_data.get('title', 'No title')}",
+        ]
+        budget = self.token_budget - sum(estimate_tokens(line) for line in header)
+
+        metadata = self._compact_metadata(scraped_data.get('metadata') or {}, int(self.token_budget * METADATA_SHARE))
+        if metadata:
+            budget -= estimate_tokens(metadata)
+
+        sections = [('Main content', scraped_data.get('content', ''))]
+        for key, value in (scraped_data.get('additional_content') or {}).items():
+            sections.append((key.replace('_', ' ').title(), value or ''))
+
+        passages = self._split(sections)
+        selected = self._select(passages, budget)
+
+        content_parts = list(header)
+        for section, _ in sections:
+            chosen = [p.text for p in selected if p.section == section]
+            if chosen:
+                content_parts.append(f"{section}: {' '.join(chosen)}")
+        if metadata:
+            content_parts.append(f"Metadata: {metadata}")
+
+        prompt_input = "\n\n".join(content_parts)
+        logger.debug(
+            f"Prompt for {scraped_data.get('url')}: kept {len(selected)}/{len(passages)} passages, "
+            f"~{estimate_tokens(prompt_input)} tokens"
+        )
+        return prompt_input
+
+    def _split(self, sections: List[Tuple[str, str]]) -> List[Passage]:
+        """Sentence-sized passages, without boilerplate repeated across pages"""
+        passages = []
+        seen = set()
+        for section, text in sections:
+            position = 0
+            for sentence in SENTENCE_SPLIT.split(' '.join(text.split())):
+                for start in range(0, len(sentence), MAX_PASSAGE_CHARS):
+                    chunk = sentence[start:start + MAX_PASSAGE_CHARS]
+                    if len(chunk) < MIN_PASSAGE_CHARS:
+                        continue
+                    fingerprint = fold(chunk)
+                    if fingerprint in seen:
+                        continue
+                    seen.add(fingerprint)
+                    passages.append(Passage(section, position, chunk))
+                    position += 1
+        return passages
+
+    def _score(self, passage: Passage) -> float:
+        folded = fold(passage.text)
+        terms = {
+            index for start, index in self._matcher.search(folded)
+            if start == 0 or not folded[start - 1].isalnum()
+        }
+        score = sum(RELEVANCE_TERMS[self._terms[index]] for index in terms)
+        # Phrases the rule engine treats as red flags or good signals are the strongest evidence
+        score += LEXICON_HIT_WEIGHT * len({index for _, index in ethics_engine.matcher.search(folded)})
+        return score
+
+    def _select(self, passages: List[Passage], budget: int) -> List[Passage]:
+        selected = []
+        used = 0
+
+        # Opening of the main page: what the company says it does
+        intro_budget = int(self.token_budget * INTRO_SHARE)
+        for passage in passages:
+            if passage.section != 'Main content' or used + passage.tokens > intro_budget:
+                break
+            selected.append(passage)
+            used += passage.tokens
+
+        remaining = passages[len(selected):]
+        for passage in remaining:
+            passage.score = self._score(passage)
+
+        # Greedy by relevance per token; position breaks ties in favour of earlier text
+        ranked = sorted(
+            (p for p in remaining if p.score > 0),
+            key=lambda p: (-p.score / p.tokens, p.section != 'Main content', p.position)
+        )
+        for passage in ranked:
+            if used + passage.tokens <= budget:
+                selected.append(passage)
+                used += passage.tokens
+
+        # Leftover budget: unscored text in reading order, so small pages are sent whole
+        for passage in remaining:
+            if passage.score <= 0 and used + passage.tokens <= budget:
+                selected.append(passage)
+                used += passage.tokens
+
+        order = {section: i for i, section in enumerate(dict.fromkeys(p.section for p in passages))}
+        selected.sort(key=lambda p: (order[p.section], p.position))
+        return selected
+
+    @staticmethod
+    def _compact_metadata(metadata: Dict, token_limit: int) -> Optional[str]:
+        """Minified JSON of the useful metadata, trimmed to fit ``token_limit``"""
+        compact = {key: metadata[key] for key in METADATA_KEYS if metadata.get(key)}
+        links = metadata.get('important_links') or []
+        if links:
+            compact['links'] = list(dict.fromkeys(
+                f"{link.get('text', '')[:40]} -> {link.get('href', '')}" for link in links
+            ))
+
+        while compact:
+            encoded = json.dumps(compact, ensure_ascii=False, separators=(',', ':'))
+            if estimate_tokens(encoded) <= token_limit:
+                return encoded
+            if compact.get('links'):
+                compact['links'].pop()
+                if not compact['links']:
+                    del compact['links']
+            else:
+                compact.popitem()
+        return None
+
+
+prompt_builder = PromptBuilder()
@@ -0,0 +1,124 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.services.cache import CacheService
+
+logger = logging.getLogger(__name__)
+
+# Refill and take ``cost`` tokens atomically; a negative cost refunds.
+# Uses the server clock so workers with skewed clocks share one bucket.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if cost <= tokens then
+    tokens = math.min(capacity, tokens - cost)
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateLimitDecision:
+    def __init__(self, allowed: bool, limit: int, tokens: float, cost: float, rate: float):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = max(0, math.floor(tokens))
+        # Seconds until the request could succeed, and until the bucket is full again
+        self.retry_after = 0 if allowed else math.ceil((cost - tokens) / rate)
+        self.reset_after = math.ceil((limit - tokens) / rate)
+
+    def headers(self) -> dict:
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(self.reset_after),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(self.retry_after)
+        return headers
+
+
+class RateLimiter:
+    """Token bucket per client: ``burst`` requests at once, refilled at ``per_minute``.
+
+    Buckets live in this process, or in Redis with ``distributed=True`` so
+    every worker shares them. If Redis fails, the local buckets take over
+    until it is retried.
+    """
+
+    def __init__(
+        self,
+        per_minute: int = settings.RATE_LIMIT_PER_MINUTE,
+        burst: int = settings.RATE_LIMIT_BURST,
+        distributed: bool = settings.RATE_LIMIT_DISTRIBUTED,
+        max_clients: int = settings.RATE_LIMIT_MAX_CLIENTS,
+    ):
+        self.capacity = burst or per_minute
+        self.rate = per_minute / 60
+        self.distributed = distributed
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._script = None
+        self._script_client = None
+        self.rejected = 0
+
+    async def acquire(self, client_key: str, cost: float = 1) -> RateLimitDecision:
+        """Take ``cost`` tokens if the client has them"""
+        allowed, tokens = await self._take(client_key, cost)
+        if not allowed:
+            self.rejected += 1
+        return RateLimitDecision(allowed, self.capacity, tokens, cost, self.rate)
+
+    async def refund(self, client_key: str, amount: float) -> RateLimitDecision:
+        """Give back tokens for work that turned out cheap (e.g. a cached result)"""
+        _, tokens = await self._take(client_key, -amount)
+        return RateLimitDecision(True, self.capacity, tokens, 0, self.rate)
+
+    async def _take(self, client_key: str, cost: float) -> Tuple[bool, float]:
+        if self.distributed:
+            client = CacheService.redis_client()
+            if client is not None:
+                try:
+                    if self._script_client is not client:
+                        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                        self._script_client = client
+                    allowed, tokens = await self._script(
+                        keys=[f"ratelimit:{client_key}"], args=[self.capacity, self.rate, cost]
+                    )
+                    return bool(allowed), float(tokens)
+                except Exception as e:
+                    CacheService.report_redis_error(e)
+        return self._take_local(client_key, cost)
+
+    def _take_local(self, client_key: str, cost: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(client_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+
+        allowed = cost <= tokens
+        if allowed:
+            tokens = min(self.capacity, tokens - cost)
+
+        self._buckets[client_key] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+rate_limiter = RateLimiter()
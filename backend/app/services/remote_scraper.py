@@ -0,0 +1,103 @@
+import json
+import logging
+import math
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from app.config import settings
+from app.services import metrics, progress, tracing
+
+if TYPE_CHECKING:
+    import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+_redis: Optional['redis.Redis'] = None
+
+
+def get_redis() -> 'redis.Redis':
+    """Connection pool for the scrape queue; no read timeout, since replies are awaited with BLPOP"""
+    global _redis
+    if _redis is None:
+        import redis.asyncio as redis
+
+        _redis = redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT)
+    return _redis
+
+
+async def close_redis():
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+def result_key(job_id: str) -> str:
+    return f"{settings.SCRAPE_QUEUE_KEY}:result:{job_id}"
+
+
+class RemoteScraper:
+    """Drop-in for WebScraper that hands the scrape to a scrape worker.
+
+    The job goes onto a Redis list; the reply (the same ``scraped_data``
+    dict, or the error) comes back on a per-job key. The worker's progress
+    events and stage timings are replayed here once the reply arrives, so
+    metrics, traces and ``stage_timings`` still show navigation and parse.
+    Time spent queued and in transit is recorded as ``scrape_queue``.
+    """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def scrape_website(self, url: str, deep_scan: bool = False) -> Dict:
+        job_id = str(uuid.uuid4())
+        timeout = settings.SCRAPE_REMOTE_TIMEOUT
+        job = {
+            'id': job_id,
+            'url': url,
+            'deep_scan': deep_scan,
+            'reply_to': result_key(job_id),
+            # Workers drop jobs nobody is waiting for any more
+            'deadline': time.time() + timeout,
+        }
+
+        client = get_redis()
+        started = time.perf_counter()
+        with tracing.span('scrape.remote', url=url, job_id=job_id):
+            try:
+                await client.lpush(settings.SCRAPE_QUEUE_KEY, json.dumps(job))
+                reply = await client.blpop([job['reply_to']], timeout=math.ceil(timeout))
+            except Exception as e:
+                metrics.SCRAPE_FAILURES.inc()
+                raise Exception(f"Failed to scrape website: scrape queue unavailable ({str(e)})")
+        elapsed = time.perf_counter() - started
+
+        if reply is None:
+            metrics.SCRAPE_FAILURES.inc()
+            raise Exception(f"Failed to scrape website: no scrape worker answered within {timeout:.0f}s")
+
+        payload: Dict[str, Any] = json.loads(reply[1])
+        self._replay(payload, elapsed)
+        if not payload['ok']:
+            metrics.SCRAPE_FAILURES.inc()
+            raise Exception(payload['error'])
+        # The worker counted these pages in its own process; count them where /metrics is scraped
+        for via in payload['data'].get('fetched_via', {}).values():
+            metrics.PAGES_FETCHED.labels(via=via).inc()
+        return payload['data']
+
+    @staticmethod
+    def _replay(payload: Dict[str, Any], elapsed: float):
+        for name, duration in payload.get('stages', []):
+            progress.record_stage(name, duration)
+        progress.record_stage('scrape_queue', max(0.0, elapsed - payload.get('elapsed', 0.0)))
+
+        for event in payload.get('events', []):
+            data = dict(event)
+            name = data.pop('event')
+            data.pop('elapsed_ms', None)
+            progress.emit(name, **data)
@@ -0,0 +1,66 @@
+import logging
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from app.config import settings
+from app.utils.helpers import parse_size
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Response, Route
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBlocker:
+    """Playwright routing policy that drops requests the scraper never uses.
+
+    Aborts heavy resource types (images, fonts, media...) and requests to
+    known third-party trackers and chat widgets. Documents themselves stay
+    on Chromium's network stack; a page whose main document declares more
+    than ``MAX_PAGE_SIZE`` is closed as soon as its headers arrive and
+    recorded in ``oversized``.
+    """
+
+    def __init__(
+        self,
+        resource_types: Iterable[str] = settings.SCRAPER_BLOCKED_RESOURCE_TYPES,
+        tracker_domains: Iterable[str] = settings.SCRAPER_TRACKER_DOMAINS,
+        max_bytes: Optional[int] = parse_size(settings.MAX_PAGE_SIZE),
+    ):
+        self.resource_types = set(resource_types)
+        self.tracker_domains = tuple(domain.lower() for domain in tracker_domains)
+        self.max_bytes = max_bytes
+        self.blocked = 0
+        self.oversized: Dict['Page', int] = {}
+
+    async def attach(self, context: 'BrowserContext'):
+        await context.route("**/*", self.handle)
+        if self.max_bytes:
+            context.on('response', self._check_size)
+
+    async def handle(self, route: 'Route'):
+        request = route.request
+
+        if request.resource_type in self.resource_types or self.is_tracker(request.url):
+            self.blocked += 1
+            await route.abort('blockedbyclient')
+            return
+
+        await route.continue_()
+
+    def is_tracker(self, url: str) -> bool:
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == domain or host.endswith('.' + domain) for domain in self.tracker_domains)
+
+    async def _check_size(self, response: 'Response'):
+        request = response.request
+        if not request.is_navigation_request() or request.frame.parent_frame is not None:
+            return
+
+        declared = int(response.headers.get('content-length') or 0)
+        if declared > self.max_bytes:
+            logger.warning(f"Blocked {request.url}: {declared} bytes exceeds MAX_PAGE_SIZE")
+            self.blocked += 1
+            page = request.frame.page
+            self.oversized[page] = declared
+            await page.close()
@@ -0,0 +1,134 @@
+"""Scrape worker service.
+
+Runs the browser pool and parser pool in their own process and serves
+scrape jobs that API workers (``SCRAPER_MODE=remote``) push onto a Redis
+list. Browser capacity then scales with the number of scrape workers,
+independently of the API workers.
+
+Usage (from backend/):
+    python -m app.services.scrape_worker
+"""
+import asyncio
+import json
+import logging
+import signal
+import time
+from typing import Any, Dict, List, Tuple
+
+import redis.asyncio as redis
+
+from app.config import settings
+from app.services import progress
+from app.services.browser_pool import browser_pool
+from app.services.parser_pool import parser_pool
+from app.services.scraper import WebScraper, close_http_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds each BRPOP blocks before checking for shutdown
+POLL_TIMEOUT = 5
+
+
+class JobRecorder(progress.ProgressTracker):
+    """Tracker for one job that keeps every stage duration, to send back to the API worker"""
+
+    def __init__(self, job_id: str):
+        super().__init__(job_id)
+        self.stages: List[Tuple[str, float]] = []
+
+    def record(self, stage_name: str, duration: float):
+        super().record(stage_name, duration)
+        self.stages.append((stage_name, duration))
+
+
+class ScrapeWorker:
+    def __init__(self, concurrency: int = settings.SCRAPE_WORKER_CONCURRENCY):
+        self.concurrency = concurrency
+        self.processed = 0
+        self.failed = 0
+        self.expired = 0
+        self._stopping = asyncio.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        client = redis.from_url(settings.REDIS_URL, socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT)
+        logger.info(f"Scrape worker consuming {settings.SCRAPE_QUEUE_KEY} with {self.concurrency} slots")
+        try:
+            await asyncio.gather(*(self._consume(client) for _ in range(self.concurrency)))
+        finally:
+            await client.aclose()
+            logger.info(f"Scrape worker stopped: {self.processed} done, {self.failed} failed, {self.expired} expired")
+
+    async def _consume(self, client: redis.Redis):
+        while not self._stopping.is_set():
+            try:
+                item = await client.brpop([settings.SCRAPE_QUEUE_KEY], timeout=POLL_TIMEOUT)
+            except Exception as e:
+                logger.error(f"Scrape queue unavailable: {str(e)}")
+                await asyncio.sleep(1)
+                continue
+            if item is None:
+                continue
+
+            try:
+                job = json.loads(item[1])
+            except ValueError:
+                logger.error("Dropping malformed scrape job")
+                continue
+            if job['deadline'] < time.time():
+                self.expired += 1
+                continue
+
+            reply = await self.handle(job)
+            try:
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.lpush(job['reply_to'], json.dumps(reply))
+                    pipe.expire(job['reply_to'], settings.SCRAPE_RESULT_TTL)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"Could not reply to scrape job {job['id']}: {str(e)}")
+
+    async def handle(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Scrape like the API would in local mode, recording progress to send back"""
+        recorder = JobRecorder(job['id'])
+        started = time.perf_counter()
+        try:
+            with progress.use_tracker(recorder):
+                async with WebScraper(pool=browser_pool) as scraper:
+                    data = await scraper.scrape_website(job['url'], job['deep_scan'])
+            reply = {'ok': True, 'data': data}
+            self.processed += 1
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e)}
+            self.failed += 1
+
+        reply.update(
+            elapsed=time.perf_counter() - started,
+            stages=recorder.stages,
+            events=recorder.events,
+        )
+        return reply
+
+
+async def main():
+    parser_pool.start()
+    await browser_pool.start()
+    worker = ScrapeWorker()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    try:
+        await worker.run()
+    finally:
+        await browser_pool.stop()
+        await close_http_client()
+        parser_pool.stop()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
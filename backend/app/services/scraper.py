@@ -1,160 +1,450 @@
-from playwright.async_api import async_playwright, Browser, Page
-from bs4 import BeautifulSoup
 import asyncio
+import httpx
 import logging
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import re
 
 from app.config import settings
+from app.services.browser_pool import BrowserPool, BROWSER_ARGS
+from app.services.request_blocking import RequestBlocker
+from app.services.parser_pool import parser_pool
+from app.utils.helpers import parse_size
+from app.services import metrics, progress, tracing
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
 
 logger = logging.getLogger(__name__)
 
+# Keywords used to rank discovered links for each deep-scan page type
+DEEP_SCAN_KEYWORDS = {
+    'privacy': ['privacy', 'privacidad', 'datos personales', 'data protection', 'gdpr'],
+    'terms': ['terms', 'términos', 'terminos', 'condiciones', 'conditions'],
+    'about': ['about', 'acerca', 'nosotros', 'quienes somos', 'quiénes somos', 'company']
+}
+
+# Fallback URL patterns when the page links to nothing relevant
+DEEP_SCAN_PATTERNS = {
+    'privacy': ['/privacy', '/privacy-policy', '/privacidad'],
+    'terms': ['/terms', '/terms-of-service', '/terminos'],
+    'about': ['/about', '/about-us', '/acerca']
+}
+
+MAX_LINK_CANDIDATES = 3
+
+# Markers of client-rendered apps whose HTML is an empty shell
+SPA_ROOT_PATTERN = re.compile(
+    r'<div[^>]+id=["\'](?:root|app|__next|___gatsby|__nuxt)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+SPA_MARKERS = ['data-reactroot', 'ng-app', 'ng-version', 'window.__NUXT__', '__NEXT_DATA__']
+NOSCRIPT_PATTERN = re.compile(r'<noscript[^>]*>(.*?)</noscript>', re.IGNORECASE | re.DOTALL)
+JS_REQUIRED_PHRASES = ['enable javascript', 'javascript is required', 'activa javascript', 'habilita javascript']
+
+# Status codes worth retrying in a real browser (bot protection, rate limits)
+BROWSER_RETRY_STATUSES = {403, 429, 503}
+
+# Share of pages served by each fetch path since startup
+fetch_stats = {'http': 0, 'browser': 0}
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def count_fetch(via: str):
+    """Record which path served a page, for the load test and for Prometheus"""
+    fetch_stats[via] += 1
+    metrics.PAGES_FETCHED.labels(via=via).inc()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide pooled HTTP client for the fast fetch path"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            headers={'User-Agent': settings.USER_AGENT},
+            timeout=settings.SCRAPER_HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.SCRAPER_HTTP_MAX_CONNECTIONS),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 class WebScraper:
-    def __init__(self):
-        self.browser: Optional[Browser] = None
+    def __init__(self, pool: Optional[BrowserPool] = None, fetch_mode: str = settings.SCRAPER_FETCH_MODE):
+        self.pool = pool
+        self.fetch_mode = fetch_mode
+        self.playwright = None
+        self.browser: Optional['Browser'] = None
+        self.context: Optional['BrowserContext'] = None
+        self._lease = None
+        self._context_lock = asyncio.Lock()
+        self.blocker = RequestBlocker()
+        self.max_page_size = parse_size(settings.MAX_PAGE_SIZE)
         self.timeout = settings.SCRAPING_TIMEOUT * 1000  # Convert to ms
         
     async def __aenter__(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            args=['--no-sandbox', '--disable-dev-shm-usage']
-        )
+        if self.fetch_mode == 'browser':
+            await self._ensure_context()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._lease:
+            await self._lease.__aexit__(exc_type, exc_val, exc_tb)
+            self._lease = None
+            return
         if self.browser:
             await self.browser.close()
-        await self.playwright.stop()
+        if self.playwright:
+            await self.playwright.stop()
+
+    async def _ensure_context(self) -> 'BrowserContext':
+        """Get a browser context, only once a page actually needs one"""
+        async with self._context_lock:
+            if self.context is not None:
+                return self.context
+            
+            if self.pool and self.pool.started:
+                # Lease an isolated context from the shared pool
+                self._lease = self.pool.lease()
+                self.context = await self._lease.__aenter__()
+            else:
+                from playwright.async_api import async_playwright
+
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(
+                    headless=True,
+                    args=BROWSER_ARGS
+                )
+                self.context = await self.browser.new_context(user_agent=settings.USER_AGENT)
+            
+            await self.blocker.attach(self.context)
+            return self.context
 
     async def scrape_website(self, url: str, deep_scan: bool = False) -> Dict:
         """Scrape website content"""
         try:
-            page = await self.browser.new_page()
-            await page.set_extra_http_headers({
-                'User-Agent': settings.USER_AGENT
-            })
-            
             # Navigate to main page
             logger.info(f"Scraping {url}")
-            await page.goto(url, timeout=self.timeout, wait_until='networkidle')
-            
-            # Get main content
-            content = await page.content()
-            title = await page.title()
-            
-            # Extract text content
-            soup = BeautifulSoup(content, 'html.parser')
-            text_content = self._extract_text_content(soup)
-            
-            # Extract metadata
-            metadata = self._extract_metadata(soup)
+            progress.emit('navigation_started', url=url)
+            page_data = await self._load_page(url, self.timeout, main=True)
             
             result = {
                 'url': url,
-                'title': title,
-                'content': text_content,
-                'metadata': metadata,
+                'final_url': page_data['final_url'],
+                'title': page_data['title'],
+                'content': page_data['content'],
+                'metadata': page_data['metadata'],
                 'pages_analyzed': 1,
-                'content_length': len(text_content)
+                'content_length': len(page_data['content']),
+                'fetched_via': {'main': page_data['fetched_via']}
             }
             
             # Deep scan - get additional pages
             if deep_scan:
-                additional_content = await self._deep_scan(page, url)
+                additional_content = await self._deep_scan(page_data['final_url'], page_data['metadata']['important_links'])
+                result['fetched_via'].update(additional_content.pop('fetched_via'))
                 result.update(additional_content)
             
-            await page.close()
             return result
             
         except Exception as e:
             logger.error(f"Error scraping {url}: {str(e)}")
+            metrics.SCRAPE_FAILURES.inc()
             raise Exception(f"Failed to scrape website: {str(e)}")
 
-    def _extract_text_content(self, soup: BeautifulSoup) -> str:
-        """Extract clean text content from HTML"""
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-        
-        # Get text and clean it
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text[:50000]  # Limit content length
-
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict:
-        """Extract metadata from HTML"""
-        metadata = {}
-        
-        # Meta tags
-        meta_tags = soup.find_all('meta')
-        for tag in meta_tags:
-            name = tag.get('name') or tag.get('property')
-            content = tag.get('content')
-            if name and content:
-                metadata[name] = content
-        
-        # Links to important pages
-        important_links = []
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '').lower()
-            text = link.get_text().lower().strip()
+    async def _load_page(self, url: str, timeout: int, main: bool = False) -> Optional[Dict]:
+        """Fetch and extract a page, escalating to the browser only when needed.
+
+        Returns None for deep-scan pages that do not exist.
+        """
+        stage_name = 'navigation' if main else 'deep_scan_navigation'
+        event = 'navigation_completed' if main else None
+        
+        if self.fetch_mode != 'browser':
+            with progress.stage(stage_name, event=event, fetched_via='http'), \
+                    tracing.span('http.get', url=url) as trace_span:
+                fetched = await self._fetch_http(url, timeout)
+                if trace_span is not None and fetched is not None:
+                    trace_span.attrs['status'] = fetched[0]
+            
+            if fetched is not None:
+                status, html, final_url = fetched
+                if status < 400:
+                    page_data = await self._parse_page(html, final_url, main)
+                    if self.fetch_mode == 'http' or not self._needs_browser(html, page_data['content']):
+                        count_fetch('http')
+                        return page_data
+                    logger.info(f"{url} needs JavaScript rendering, using browser")
+                elif not main and status not in BROWSER_RETRY_STATUSES:
+                    return None
+            
+            if self.fetch_mode == 'http':
+                if main:
+                    raise Exception(f"HTTP fetch failed for {url}")
+                return None
+        
+        with progress.stage(stage_name, event=event, fetched_via='browser'):
+            fetched = await self._fetch_browser(url, timeout, main)
+        if fetched is None:
+            return None
+        
+        html, final_url, title = fetched
+        page_data = await self._parse_page(html, final_url, main)
+        page_data['title'] = title or page_data['title']
+        page_data['fetched_via'] = 'browser'
+        count_fetch('browser')
+        return page_data
+
+    async def _fetch_http(self, url: str, timeout: int) -> Optional[Tuple[int, str, str]]:
+        """Plain HTTP GET; None when the response is unusable without a browser"""
+        try:
+            async with get_http_client().stream(
+                'GET', url, timeout=min(timeout / 1000, settings.SCRAPER_HTTP_TIMEOUT)
+            ) as response:
+                content_type = response.headers.get('content-type', 'text/html')
+                if 'html' not in content_type:
+                    return None
+                
+                # Enforce MAX_PAGE_SIZE without buffering oversized bodies
+                declared = int(response.headers.get('content-length') or 0)
+                if self.max_page_size and declared > self.max_page_size:
+                    raise Exception(f"Page exceeds MAX_PAGE_SIZE ({declared} bytes)")
+                
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if self.max_page_size and len(body) > self.max_page_size:
+                        raise Exception("Page exceeds MAX_PAGE_SIZE")
+                
+                encoding = response.encoding or 'utf-8'
+                return response.status_code, body.decode(encoding, errors='replace'), str(response.url)
+        except httpx.HTTPError as e:
+            logger.info(f"HTTP fetch of {url} failed: {str(e)}")
+            return None
+
+    async def _fetch_browser(self, url: str, timeout: int, main: bool) -> Optional[Tuple[str, str, str]]:
+        """Render a page in Chromium; None for deep-scan pages that do not answer OK"""
+        context = await self._ensure_context()
+        page = await context.new_page()
+        try:
+            with tracing.span('page.goto', url=url) as trace_span:
+                response = await page.goto(url, timeout=timeout, wait_until=settings.SCRAPER_WAIT_UNTIL)
+                if trace_span is not None and response is not None:
+                    trace_span.attrs['status'] = response.status
+            if main:
+                with tracing.span('page.settle'):
+                    await self._settle(page)
+            elif response is None or not response.ok:
+                return None
             
-            if any(keyword in href or keyword in text for keyword in 
-                   ['privacy', 'terms', 'about', 'contact', 'policy']):
-                important_links.append({
-                    'text': text,
-                    'href': link['href']
-                })
+            # Get main content
+            html = await page.content()
+            # Chunked or compressed documents declare no length, so also bound what actually loaded
+            size = len(html.encode('utf-8'))
+            if self.max_page_size and size > self.max_page_size:
+                raise Exception(f"Page exceeds MAX_PAGE_SIZE ({size} bytes)")
+            return html, page.url, await page.title()
+        except Exception:
+            declared = self.blocker.oversized.get(page)
+            if declared is not None:
+                raise Exception(f"Page exceeds MAX_PAGE_SIZE ({declared} bytes)")
+            raise
+        finally:
+            self.blocker.oversized.pop(page, None)
+            await page.close()
+
+    async def _settle(self, page):
+        """Give late scripts a short window to render, without waiting for full network idle"""
+        if settings.SCRAPER_SETTLE_MS <= 0:
+            return
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        try:
+            await page.wait_for_load_state('networkidle', timeout=settings.SCRAPER_SETTLE_MS)
+        except PlaywrightTimeoutError:
+            pass
+
+    async def _parse_page(self, html: str, final_url: str, main: bool) -> Dict:
+        with progress.stage('parse', event='main_page_parsed' if main else None) as info:
+            # Text, meta tags and important links in one pass, off the event loop
+            page_data = await parser_pool.extract(html, include_metadata=main)
+            info['content_length'] = len(page_data['content'])
         
-        metadata['important_links'] = important_links
-        return metadata
+        page_data['final_url'] = final_url
+        page_data['fetched_via'] = 'http'
+        return page_data
 
-    async def _deep_scan(self, page: Page, base_url: str) -> Dict:
+    def _needs_browser(self, html: str, text_content: str) -> bool:
+        """Heuristic: does this HTML need JavaScript to show its content?"""
+        if len(text_content) < settings.SCRAPER_HTTP_MIN_TEXT:
+            return True
+        
+        if SPA_ROOT_PATTERN.search(html):
+            return True
+        
+        # Framework markers only matter when little text was server-rendered
+        if len(text_content) < settings.SCRAPER_HTTP_MIN_TEXT * 4 and any(marker in html for marker in SPA_MARKERS):
+            return True
+        
+        for noscript in NOSCRIPT_PATTERN.findall(html):
+            if any(phrase in noscript.lower() for phrase in JS_REQUIRED_PHRASES):
+                return True
+        
+        return False
+
+    async def _deep_scan(self, base_url: str, important_links: List[Dict]) -> Dict:
         """Perform deep scan of additional pages"""
         additional_content = {}
+        fetched_via = {}
         pages_scanned = 1
         
         # Look for privacy policy and terms of service
         important_pages = ['privacy', 'terms', 'about']
         
-        for page_type in important_pages:
-            try:
-                # Try to find and scrape the page
-                page_content = await self._scrape_specific_page(page, base_url, page_type)
-                if page_content:
-                    additional_content[f'{page_type}_content'] = page_content
-                    pages_scanned += 1
-            except Exception as e:
-                logger.warning(f"Could not scrape {page_type} page: {str(e)}")
+        # Each page type is fetched concurrently on its own pages
+        results = await asyncio.gather(
+            *(self._scan_page_type(base_url, page_type, important_links) for page_type in important_pages),
+            return_exceptions=True
+        )
+        
+        for page_type, page_data in zip(important_pages, results):
+            if isinstance(page_data, Exception):
+                logger.warning(f"Could not scrape {page_type} page: {str(page_data)}")
+            elif page_data:
+                additional_content[f'{page_type}_content'] = page_data['content']
+                fetched_via[page_type] = page_data['fetched_via']
+                pages_scanned += 1
         
         return {
             'additional_content': additional_content,
             'pages_analyzed': pages_scanned,
-            'deep_scan_completed': True
+            'deep_scan_completed': True,
+            'fetched_via': fetched_via
         }
 
-    async def _scrape_specific_page(self, page: Page, base_url: str, page_type: str) -> Optional[str]:
-        """Scrape specific page type"""
-        # Common URL patterns for different page types
-        patterns = {
-            'privacy': ['/privacy', '/privacy-policy', '/privacidad'],
-            'terms': ['/terms', '/terms-of-service', '/terminos'],
-            'about': ['/about', '/about-us', '/acerca']
-        }
+    async def _scan_page_type(self, base_url: str, page_type: str, important_links: List[Dict]) -> Optional[Dict]:
+        with progress.stage('deep_scan_page', event='deep_scan_page_fetched', page_type=page_type) as info:
+            page_data = await self._scrape_specific_page(base_url, page_type, important_links)
+            info['found'] = bool(page_data)
+            if page_data:
+                info['fetched_via'] = page_data['fetched_via']
+        return page_data
+
+    async def _scrape_specific_page(self, base_url: str, page_type: str,
+                                    important_links: Optional[List[Dict]] = None) -> Optional[Dict]:
+        """Scrape specific page type, preferring links found on the main page"""
+        links = self._rank_links(base_url, page_type, important_links or [])
+        if links:
+            page_data = await self._first_good(links, ordered=True)
+            if page_data:
+                return page_data
         
-        for pattern in patterns.get(page_type, []):
-            try:
-                url = urljoin(base_url, pattern)
-                await page.goto(url, timeout=10000)
-                content = await page.content()
-                soup = BeautifulSoup(content, 'html.parser')
-                return self._extract_text_content(soup)[:10000]  # Limit content
-            except:
+        # Nothing usable was linked: guess common URL patterns
+        seen = set(self._canonical_link(url) for url in links)
+        seen.add(self._canonical_link(base_url))
+        candidates = []
+        for pattern in DEEP_SCAN_PATTERNS.get(page_type, []):
+            url = urljoin(base_url, pattern)
+            if self._canonical_link(url) not in seen:
+                seen.add(self._canonical_link(url))
+                candidates.append(url)
+        
+        return await self._first_good(candidates, ordered=False)
+
+    def _rank_links(self, base_url: str, page_type: str, important_links: List[Dict]) -> List[str]:
+        """Resolve, dedupe and rank discovered links for a page type"""
+        keywords = DEEP_SCAN_KEYWORDS.get(page_type, [])
+        base_host = urlparse(base_url).netloc.lower().removeprefix('www.')
+        base_canonical = self._canonical_link(base_url)
+        
+        scores: Dict[str, int] = {}
+        urls: Dict[str, str] = {}
+        for link in important_links:
+            href = (link.get('href') or '').strip()
+            if not href or href.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+                continue
+            
+            url = urljoin(base_url, href)
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https'):
+                continue
+            
+            path = parsed.path.lower()
+            text = (link.get('text') or '').lower()
+            score = sum(2 for keyword in keywords if keyword in path) + \
+                sum(3 for keyword in keywords if keyword in text)
+            if not score:
+                continue
+            
+            # Policies hosted elsewhere (e.g. a third party's privacy page) rank lower
+            if parsed.netloc.lower().removeprefix('www.') == base_host:
+                score += 1
+            
+            canonical = self._canonical_link(url)
+            if canonical == base_canonical:
                 continue
+            if score > scores.get(canonical, 0):
+                scores[canonical] = score
+                urls[canonical] = url.split('#')[0]
+        
+        ranked = sorted(scores, key=lambda canonical: scores[canonical], reverse=True)
+        return [urls[canonical] for canonical in ranked[:MAX_LINK_CANDIDATES]]
+
+    @staticmethod
+    def _canonical_link(url: str) -> str:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower().removeprefix('www.')
+        path = parsed.path.rstrip('/') or '/'
+        query = f"?{parsed.query}" if parsed.query else ''
+        return f"{host}{path}{query}"
+
+    async def _first_good(self, candidates: List[str], ordered: bool) -> Optional[Dict]:
+        """Fetch candidates concurrently and return the first good page.
+
+        With ``ordered`` the best-ranked good candidate wins, otherwise the
+        fastest one does. Remaining navigations are cancelled.
+        """
+        tasks = [asyncio.create_task(self._fetch_candidate(url)) for url in candidates]
+        pending = set(tasks)
+        
+        try:
+            while pending:
+                _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if not task.done():
+                        if ordered:
+                            # A better-ranked candidate is still loading
+                            break
+                        continue
+                    if not task.cancelled() and task.exception() is None and task.result():
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_candidate(self, url: str) -> Optional[Dict]:
+        """Fetch one candidate URL; None unless it answers OK"""
+        with tracing.span('deep_scan_candidate', url=url) as trace_span:
+            try:
+                page_data = await self._load_page(url, 10000)
+            except Exception as e:
+                logger.debug(f"Candidate {url} failed: {str(e)}")
+                return None
+            if trace_span is not None:
+                trace_span.attrs['found'] = bool(page_data and page_data['content'])
         
-        return None 
\ No newline at end of file
+        if page_data is None or not page_data['content']:
+            return None
+        page_data['content'] = page_data['content'][:10000]  # Limit content
+        return page_data
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.services.cache import CacheService
+
+logger = logging.getLogger(__name__)
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single execution.
+
+    The first caller for a key (the leader) starts the work; followers await
+    the leader's task instead of repeating it. With ``distributed=True`` the
+    leader also takes a Redis lock, so workers in other processes wait for
+    the result to appear in the cache instead of computing it themselves.
+    """
+
+    def __init__(
+        self,
+        distributed: bool = settings.SINGLEFLIGHT_DISTRIBUTED,
+        lock_ttl: int = settings.SINGLEFLIGHT_LOCK_TTL,
+        poll_interval: float = settings.SINGLEFLIGHT_POLL_INTERVAL,
+    ):
+        self.distributed = distributed
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """Run fn once per key; lookup returns a result another worker stored"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"Joining in-flight analysis for {key}")
+        else:
+            task = asyncio.ensure_future(self._run(key, fn, lookup))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller going away does not cancel the shared work
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def _run(self, key, fn, lookup):
+        if not self.distributed or lookup is None:
+            return await fn()
+
+        client = CacheService.redis_client()
+        if client is None:
+            return await fn()
+
+        lock_key = f"lock:{key}"
+        token = str(uuid.uuid4())
+        deadline = time.monotonic() + self.lock_ttl
+
+        while True:
+            try:
+                acquired = await client.set(lock_key, token, nx=True, ex=self.lock_ttl)
+            except Exception as e:
+                CacheService.report_redis_error(e)
+                return await fn()
+
+            if acquired:
+                try:
+                    # Another worker may have finished just before we got the lock
+                    existing = await lookup()
+                    if existing is not None:
+                        return existing
+                    return await fn()
+                finally:
+                    await self._release(client, lock_key, token)
+
+            # Another worker holds the lock: wait for its result
+            await asyncio.sleep(self.poll_interval)
+            existing = await lookup()
+            if existing is not None:
+                return existing
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out waiting for lock {lock_key}, running locally")
+                return await fn()
+
+    async def _release(self, client, lock_key: str, token: str):
+        try:
+            await client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            CacheService.report_redis_error(e)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = 'X-Debug-Trace'
+SERVICE_NAME = 'ethics-detector'
+PROFILE_MAX_DEPTH = 64
+PROFILE_TOP_STACKS = 200
+
+
+class Span:
+    """One timed operation in a trace; children are the operations it awaited"""
+
+    __slots__ = ('name', 'span_id', 'parent', 'attrs', 'start_ns', 'end_ns', 'error', 'children')
+
+    def __init__(self, name: str, parent: Optional['Span'], attrs: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent = parent
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self.children: List['Span'] = []
+        if parent is not None:
+            parent.children.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return round((end_ns - self.start_ns) / 1e6, 3)
+
+    def to_dict(self, trace_start_ns: int) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'start_ms': round((self.start_ns - trace_start_ns) / 1e6, 3),
+            'duration_ms': self.duration_ms,
+            'attrs': self.attrs,
+            'error': self.error,
+            'children': [child.to_dict(trace_start_ns) for child in self.children],
+        }
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread at a fixed interval.
+
+    Samples are process-wide: the event loop is shared, so the profile of a
+    traced request also shows whatever else ran on the loop meanwhile.
+    Stacks are folded (``thread;outer;...;inner``) as used by flame graph
+    tools.
+    """
+
+    def __init__(self, interval: float = settings.TRACE_PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='trace-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        leaves: Counter = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return {
+            'interval_ms': self.interval * 1000,
+            'samples': self.samples,
+            'top_functions': [{'function': name, 'samples': count} for name, count in leaves.most_common(30)],
+            'stacks': [{'stack': stack, 'samples': count} for stack, count in self._stacks.most_common(PROFILE_TOP_STACKS)],
+        }
+
+
+class Trace:
+    def __init__(self, name: str, trace_id: Optional[str] = None, **attrs):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.root = Span(name, None, attrs)
+        self.spans: List[Span] = [self.root]
+        self.profiler: Optional[SamplingProfiler] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'trace_id': self.trace_id,
+            'service': SERVICE_NAME,
+            'root': self.root.to_dict(self.root.start_ns),
+        }
+        if self.profiler is not None:
+            data['profile'] = self.profiler.to_dict()
+        return data
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/HTTP JSON payload (ExportTraceServiceRequest)"""
+        def attributes(attrs: Dict[str, Any]) -> List[Dict[str, Any]]:
+            encoded = []
+            for key, value in attrs.items():
+                if isinstance(value, bool):
+                    encoded.append({'key': key, 'value': {'boolValue': value}})
+                elif isinstance(value, int):
+                    encoded.append({'key': key, 'value': {'intValue': str(value)}})
+                elif isinstance(value, float):
+                    encoded.append({'key': key, 'value': {'doubleValue': value}})
+                else:
+                    encoded.append({'key': key, 'value': {'stringValue': str(value)}})
+            return encoded
+
+        spans = []
+        for span in self.spans:
+            spans.append({
+                'traceId': self.trace_id,
+                'spanId': span.span_id,
+                'parentSpanId': span.parent.span_id if span.parent else '',
+                'name': span.name,
+                'kind': 2 if span.parent is None else 1,  # SERVER for the root, INTERNAL otherwise
+                'startTimeUnixNano': str(span.start_ns),
+                'endTimeUnixNano': str(span.end_ns or time.time_ns()),
+                'attributes': attributes(span.attrs),
+                'status': {'code': 2, 'message': span.error} if span.error else {'code': 0},
+            })
+        return {'resourceSpans': [{
+            'resource': {'attributes': attributes({'service.name': SERVICE_NAME})},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+        }]}
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('trace_span', default=None)
+_profiling = threading.Lock()
+_exports: Set[asyncio.Task] = set()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def requested(header_value: Optional[str]) -> Optional[str]:
+    """What the debug header asks for: None, "trace" or "profile" (ignored unless enabled)"""
+    if not settings.TRACE_HEADER_ENABLED or not header_value:
+        return None
+    value = header_value.strip().lower()
+    if value == 'profile':
+        return 'profile'
+    return 'trace' if value in ('1', 'true', 'trace') else None
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Optional[Span]]:
+    """Record a child span of the current one; a no-op outside a trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    current = Span(name, _current_span.get() or trace.root, attrs)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {str(e)}"[:300]
+        raise
+    finally:
+        current.end_ns = time.time_ns()
+        _current_span.reset(token)
+
+
+@asynccontextmanager
+async def traced(name: str, mode: Optional[str] = None, trace_id: Optional[str] = None,
+                 **attrs) -> AsyncIterator[Optional[Trace]]:
+    """Trace the enclosed work if ``mode`` asks for it or the sampler picks it.
+
+    ``mode`` is "trace" or "profile" (see ``requested``). Sampled traces
+    are profiled only with ``TRACE_PROFILE_SAMPLED``. One CPU profile runs
+    at a time; concurrent requests for one are traced without it. The
+    trace is exported in the background once the block exits.
+    """
+    if mode is None and settings.TRACE_SAMPLE_RATE > 0 and random.random() < settings.TRACE_SAMPLE_RATE:
+        mode = 'profile' if settings.TRACE_PROFILE_SAMPLED else 'trace'
+    if mode is None:
+        yield None
+        return
+
+    trace = Trace(name, trace_id, **attrs)
+    if mode == 'profile':
+        if _profiling.acquire(blocking=False):
+            trace.profiler = SamplingProfiler()
+            trace.profiler.start()
+        else:
+            trace.root.attrs['profile_skipped'] = 'another profile is running'
+
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(trace.root)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.error = f"{type(e).__name__}: {str(e)}"[:300]
+        raise
+    finally:
+        trace.root.end_ns = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        if trace.profiler is not None:
+            await asyncio.to_thread(trace.profiler.stop)
+            _profiling.release()
+
+        task = asyncio.create_task(export(trace))
+        _exports.add(task)
+        task.add_done_callback(_exports.discard)
+
+
+async def export(trace: Trace):
+    """Write the trace as JSON under TRACE_DIR and/or send it to an OTLP/HTTP collector"""
+    exporters = {name.strip() for name in settings.TRACE_EXPORTER.split(',')}
+    try:
+        if 'json' in exporters:
+            path = os.path.join(settings.TRACE_DIR, f"{trace.trace_id}.json")
+            await asyncio.to_thread(_write_json, path, trace.to_dict())
+            logger.info(f"Trace {trace.trace_id} written to {path}")
+        if 'otlp' in exporters:
+            import httpx
+
+            async with httpx.AsyncClient(timeout=5) as client:
+                response = await client.post(settings.TRACE_OTLP_ENDPOINT, json=trace.to_otlp())
+                response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Failed to export trace {trace.trace_id}: {str(e)}")
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, default=str)
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Backoff between retries of a failed step: doubles from the first delay up to the cap
+RETRY_FIRST_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+
+class Warmup:
+    """Readies the slow dependencies after the server starts listening.
+
+    Lifespan startup only does what no request can do without (the
+    database); launching browsers, building the LLM client, spawning parser
+    workers and connecting to Redis run here in the background, all at
+    once. ``ready`` turns true only once every step has succeeded, so a
+    readiness probe keeps traffic away until then while liveness is
+    answered right away. Failed steps are retried with backoff until they
+    succeed, so a fault at boot (Redis not up yet, a browser that crashed
+    on launch) does not keep the process out of rotation for good.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.duration_ms: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, steps: Dict[str, Callable[[], Awaitable[Any]]]):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(steps))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'ready': self.ready,
+            'duration_ms': self.duration_ms,
+            'steps': self.steps,
+        }
+
+    async def _run(self, steps: Dict[str, Callable[[], Awaitable[Any]]]):
+        started = time.perf_counter()
+        for name in steps:
+            self.steps[name] = {'status': 'pending', 'attempts': 0}
+        await asyncio.gather(*(self._step(name, step) for name, step in steps.items()))
+
+        self.duration_ms = round((time.perf_counter() - started) * 1000)
+        self.ready = True
+        logger.info(f"✅ Ready after {self.duration_ms}ms of warmup")
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        state = self.steps[name]
+        started = time.perf_counter()
+        delay = RETRY_FIRST_DELAY
+        while True:
+            state['attempts'] += 1
+            try:
+                await step()
+                break
+            except Exception as e:
+                logger.error(f"Warmup step {name} failed (attempt {state['attempts']}), retrying in {delay:.0f}s: {str(e)}")
+                state.update(status='retrying', error=str(e)[:300])
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX_DELAY)
+
+        state['status'] = 'ok'
+        state.pop('error', None)
+        state['duration_ms'] = round((time.perf_counter() - started) * 1000)
+
+
+warmup = Warmup()
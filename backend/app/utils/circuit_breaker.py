@@ -0,0 +1,61 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated failures.
+
+    ``closed``: calls go through. After ``failure_threshold`` consecutive
+    failures the breaker opens and ``allow()`` returns False for
+    ``reset_timeout`` seconds. Then it is ``half_open``: one trial call is
+    let through, and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_at = 0.0
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        # One trial at a time; a trial that never reports back is given up after reset_timeout
+        if state == self.HALF_OPEN and time.monotonic() - self._trial_at >= self.reset_timeout:
+            self._trial_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        if self.failures >= self.failure_threshold:
+            logger.info(f"Circuit {self.name} closed")
+        self.failures = 0
+        self._trial_at = 0.0
+
+    def record_failure(self):
+        self._trial_at = 0.0
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            # Opening, or re-opening after a failed trial
+            if self.failures == self.failure_threshold or self.state != self.OPEN:
+                self.trips += 1
+                logger.warning(f"Circuit {self.name} open for {self.reset_timeout}s after {self.failures} failures")
+            self.opened_at = time.monotonic()
@@ -1 +1,11 @@
-# ... existing code ... 
\ No newline at end of file
+# ... existing code ... 
+
+SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+def parse_size(value: str) -> int:
+    """Parse a human size such as '5MB' or '512KB' into bytes"""
+    value = value.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if value.endswith(unit):
+            return int(float(value[:-len(unit)].strip()) * SIZE_UNITS[unit])
+    return int(value)
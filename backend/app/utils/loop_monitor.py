@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep.
+
+    A healthy loop wakes within a millisecond or two; sustained lag means
+    something is blocking it (e.g. CPU-bound parsing on the loop thread).
+    """
+
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.2):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.avg_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'last_ms': round(self.last_lag * 1000, 2),
+            'avg_ms': round(self.avg_lag * 1000, 2),
+            'max_ms': round(self.max_lag * 1000, 2),
+        }
+
+    async def _run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - start - self.interval)
+
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            # Exponentially weighted so the average follows recent load
+            self.avg_lag = 0.9 * self.avg_lag + 0.1 * lag
+
+            if lag > self.warn_threshold:
+                logger.warning(f"Event loop lagged {lag * 1000:.0f}ms")
+
+
+loop_monitor = LoopLagMonitor()
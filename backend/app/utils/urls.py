@@ -0,0 +1,48 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Query parameters that only identify the referral and never change the page
+TRACKING_PARAMS = {
+    'gclid', 'gclsrc', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid',
+    'twclid', 'ttclid', 'li_fat_id', 'igshid', 'mc_cid', 'mc_eid', 'mkt_tok',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'ref_src', 'ref_url',
+}
+TRACKING_PARAM_PREFIXES = ('utm_', 'hsa_', 'pk_', 'mtm_')
+
+
+def is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so variants of the same page share one key.
+
+    http and https, host case, a leading ``www.``, default ports, trailing
+    slashes, tracking parameters, query order and fragments are all ignored:
+    ``http://WWW.X.ai:80/?utm_source=tw#top`` becomes ``https://x.ai``.
+    The result is a key, not a fetchable URL; scrape the original.
+    """
+    parts = urlsplit(url.strip())
+
+    host = (parts.hostname or '').lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+
+    scheme = parts.scheme.lower()
+    port = parts.port
+    netloc = host
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+
+    path = parts.path.rstrip('/')
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not is_tracking_param(name)
+    )
+
+    return urlunsplit(('https', netloc, path, urlencode(query), ''))
+
@@ -1,4 +1,12 @@
 # ... existing code ... 
 
+from urllib.parse import urlsplit
+
 def validate_url(url: str) -> bool:
-    return url.startswith('http') 
\ No newline at end of file
+    """Accept absolute http(s) URLs with a host"""
+    try:
+        parts = urlsplit(url.strip())
+        parts.port  # raises ValueError on an invalid port
+    except ValueError:
+        return False
+    return parts.scheme.lower() in ('http', 'https') and bool(parts.hostname)
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Microbenchmark for the HTML extraction backends.
+
+Compares the pre-refactor scraper path (BeautifulSoup text extraction
+followed by a second walk for metadata) with the pluggable extractors in
+``app.services.extractors`` over a corpus of saved HTML pages.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extractors [--corpus DIR] [--repeat N] [--json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from app.services.extractors import Bs4Extractor, LxmlExtractor  # noqa: E402
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / 'corpus'
+
+
+def legacy_extract(html: str) -> dict:
+    """The scraper's original path: decompose, get_text, then a second find_all walk"""
+    extractor = Bs4Extractor()
+    soup = BeautifulSoup(html, 'html.parser')
+    content = extractor._extract_text_content(soup)
+    metadata = extractor._extract_metadata(soup)
+    return {'title': soup.title.get_text().strip() if soup.title else '', 'content': content, 'metadata': metadata}
+
+
+BACKENDS = {
+    'legacy': legacy_extract,
+    'bs4': Bs4Extractor().extract,
+    'lxml': LxmlExtractor().extract,
+}
+
+
+def time_backend(extract, html: str, repeat: int) -> float:
+    """Median seconds per extraction"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(html)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run(corpus: Path, repeat: int) -> dict:
+    pages = sorted(corpus.glob('*.html'))
+    if not pages:
+        raise SystemExit(f"No .html files in {corpus}")
+
+    results = {'corpus': str(corpus), 'repeat': repeat, 'pages': {}, 'totals': {}, 'empty': []}
+    for path in pages:
+        html = path.read_text(encoding='utf-8', errors='replace')
+        page_result = {'bytes': len(html.encode())}
+        for name, extract in BACKENDS.items():
+            page_result[name] = time_backend(extract, html, repeat)
+            data = extract(html)
+            page_result[f'{name}_links'] = len(data['metadata'].get('important_links', []))
+            # A backend that finds nothing where the legacy path finds text has lost the page
+            if not data['content'] and legacy_extract(html)['content']:
+                results['empty'].append(f"{path.name} ({name})")
+        results['pages'][path.name] = page_result
+
+    for name in BACKENDS:
+        results['totals'][name] = sum(page[name] for page in results['pages'].values())
+    results['speedup_vs_legacy'] = {
+        name: results['totals']['legacy'] / results['totals'][name] for name in BACKENDS
+    }
+    return results
+
+
+def print_table(results: dict):
+    names = list(BACKENDS)
+    print(f"{'page':<20}{'bytes':>9}" + ''.join(f"{name + ' ms':>12}" for name in names) + f"{'links l/b/x':>14}")
+    for page, data in results['pages'].items():
+        links = '/'.join(str(data[f'{name}_links']) for name in names)
+        print(f"{page:<20}{data['bytes']:>9}" + ''.join(f"{data[name] * 1000:>12.3f}" for name in names) + f"{links:>14}")
+    print(f"{'total':<29}" + ''.join(f"{results['totals'][name] * 1000:>12.3f}" for name in names))
+    print(f"{'speedup vs legacy':<29}" + ''.join(f"{results['speedup_vs_legacy'][name]:>11.2f}x" for name in names))
+    if results['empty']:
+        print(f"\nno content extracted: {', '.join(results['empty'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', type=Path, default=DEFAULT_CORPUS, help='directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=50, help='runs per page and backend')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run(args.corpus, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+    if results['empty']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Cold-start benchmark: how long importing the API takes in a fresh interpreter.
+
+Runs ``python -X importtime -c "import app.main"`` in new processes and
+reports the median import time, the packages that cost the most, and any
+heavy module that should only load lazily (Playwright, the Gemini SDK...)
+but got imported anyway. With ``--max-ms`` or forbidden imports present it
+exits non-zero, so CI catches regressions.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import [--runs N] [--max-ms MS] [--top N] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded on first use or by the background warmup, never at import time
+FORBIDDEN = ('playwright', 'google.generativeai', 'google.api_core', 'redis', 'psutil', 'bs4')
+
+
+def import_once(module: str) -> dict:
+    """One fresh interpreter: wall time, the module's cumulative import time and self time per package"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, env=dict(os.environ), capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    packages: Dict[str, float] = defaultdict(float)
+    modules: List[str] = []
+    total_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        name = name.strip()
+        modules.append(name)
+        packages[name.split('.')[0]] += int(self_us) / 1000
+        if name == module:
+            total_us = int(cumulative_us)
+
+    return {'wall_ms': wall * 1000, 'import_ms': total_us / 1000, 'packages': packages, 'modules': modules}
+
+
+def run(module: str, runs: int, top: int) -> dict:
+    import_once(module)  # write .pyc files so every measured run is comparable
+    samples = [import_once(module) for _ in range(runs)]
+
+    package_ms: Dict[str, List[float]] = defaultdict(list)
+    for sample in samples:
+        for package, ms in sample['packages'].items():
+            package_ms[package].append(ms)
+    medians = {package: statistics.median(values) for package, values in package_ms.items()}
+
+    loaded = set(samples[-1]['modules'])
+    forbidden = [
+        prefix for prefix in FORBIDDEN
+        if any(name == prefix or name.startswith(prefix + '.') for name in loaded)
+    ]
+    return {
+        'module': module,
+        'runs': runs,
+        'import_ms': {
+            'median': round(statistics.median(s['import_ms'] for s in samples), 1),
+            'min': round(min(s['import_ms'] for s in samples), 1),
+        },
+        'wall_ms': {
+            'median': round(statistics.median(s['wall_ms'] for s in samples), 1),
+            'min': round(min(s['wall_ms'] for s in samples), 1),
+        },
+        'modules_loaded': len(loaded),
+        'top_packages': [
+            {'package': package, 'self_ms': round(ms, 1)}
+            for package, ms in sorted(medians.items(), key=lambda item: item[1], reverse=True)[:top]
+        ],
+        'forbidden_imports': forbidden,
+    }
+
+
+def print_table(results: dict):
+    print(f"import {results['module']} ({results['runs']} runs, {results['modules_loaded']} modules)")
+    print(f"{'':<20}{'median ms':>12}{'min ms':>10}")
+    for key in ('import_ms', 'wall_ms'):
+        print(f"{key:<20}{results[key]['median']:>12.1f}{results[key]['min']:>10.1f}")
+    print()
+    print(f"{'package':<28}{'self ms':>10}")
+    for entry in results['top_packages']:
+        print(f"{entry['package']:<28}{entry['self_ms']:>10.1f}")
+    if results['forbidden_imports']:
+        print(f"\nimported eagerly but should be lazy: {', '.join(results['forbidden_imports'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app.main', help='module to import')
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to measure')
+    parser.add_argument('--top', type=int, default=15, help='packages to list by import cost')
+    parser.add_argument('--max-ms', type=float, help='fail if the median import time exceeds this')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run(args.module, args.runs, args.top)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+    over_budget = args.max_ms is not None and results['import_ms']['median'] > args.max_ms
+    if over_budget:
+        print(f"Median import time {results['import_ms']['median']}ms exceeds {args.max_ms}ms", file=sys.stderr)
+    if over_budget or results['forbidden_imports']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
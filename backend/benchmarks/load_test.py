@@ -0,0 +1,407 @@
+"""End-to-end load test of the analysis API.
+
+Serves the fixture sites in ``benchmarks/corpus`` (landing, privacy and
+terms pages) from a local HTTP server, stubs the LLM with the offline fake
+provider and drives ``POST /api/v1/analyze`` on the in-process FastAPI app
+at a fixed concurrency. Reports latency percentiles, throughput, peak RSS
+(this process plus its parser workers) and where the time went per
+pipeline stage.
+
+Every site number gets its own copy of a corpus site with a unique title,
+so each one is a cache miss the first time it is requested; use
+``--sites`` smaller than ``--requests`` to mix in cache hits.
+
+Pages are fetched over plain HTTP by default; ``--fetch-mode auto`` or
+``browser`` starts the browser pool (Chromium must be installed) so the
+Playwright path is measured too.
+
+Stage totals add up the time spent inside each stage across all
+analyses. Deep-scan pages are fetched concurrently, so with ``--deep-scan``
+the scrape total can exceed the wall-clock time of a request.
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--requests N] [--concurrency N] [--deep-scan]
+                                   [--fetch-mode http|auto|browser] [--browser-pool-size N]
+                                   [--llm-latency S] [--json] [--output FILE]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / 'corpus'
+
+# Pipeline stages reported together; deep_scan_page is left out because it
+# wraps the navigation and parse of the deep-scan pages
+STAGE_GROUPS = {
+    'scrape': ('navigation', 'deep_scan_navigation', 'scrape_queue'),
+    'parse': ('parse',),
+    'prompt_build': ('prompt_build',),
+    'llm': ('llm_queue', 'llm'),
+    'structure': ('structure',),
+}
+
+# Warmup requests use site numbers from here so they never warm the measured sites
+WARMUP_SITE_OFFSET = 1_000_000
+
+
+def load_sites(corpus: Path) -> List[Dict[str, str]]:
+    """Page templates per fixture site: the corpus root and every subdirectory with an index.html"""
+    sites = []
+    for directory in [corpus] + sorted(p for p in corpus.iterdir() if p.is_dir()):
+        if (directory / 'index.html').exists():
+            sites.append({
+                path.name: path.read_text(encoding='utf-8') for path in directory.glob('*.html')
+            })
+    if not sites:
+        raise SystemExit(f"No fixture sites (index.html) in {corpus}")
+    return sites
+
+
+def render_page(template: str, number: int) -> str:
+    """A corpus page as served for site ``number``: site-relative links and a unique title"""
+    html = re.sub(r'(href|src)="/', rf'\1="/site/{number}/', template)
+    html = html.replace('<title>', f'<title>[{number}] ', 1)
+    return re.sub(r'(<body[^>]*>)', rf'\1<p>Sitio de prueba número {number} del benchmark de carga.</p>', html, count=1)
+
+
+def serve_fixtures(corpus: str, port_queue):
+    """Fixture HTTP server; runs in its own process so it does not compete with the app for the GIL"""
+    sites = load_sites(Path(corpus))
+    path_pattern = re.compile(r'^/site/(\d+)(/[^?#]*)?')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = path_pattern.match(self.path)
+            page = None
+            if match:
+                number = int(match.group(1))
+                name = (match.group(2) or '/').strip('/') or 'index.html'
+                template = sites[number % len(sites)].get(name)
+                if template is not None:
+                    page = render_page(template, number).encode()
+
+            if page is None:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class RSSSampler:
+    """Peak resident memory of this process and its children (parser workers, browsers)"""
+
+    def __init__(self, exclude_pids=(), interval: float = 0.05):
+        import psutil
+
+        self._process = psutil.Process()
+        self._exclude = set(exclude_pids)
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self) -> int:
+        import psutil
+
+        total = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            if child.pid in self._exclude:
+                continue
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        self.peak = max(self.peak, total)
+        return total
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> dict:
+    """Millisecond summary of a list of durations in seconds"""
+    ms = [s * 1000 for s in samples]
+    return {
+        'count': len(ms),
+        'total_ms': round(sum(ms), 1),
+        'mean_ms': round(statistics.mean(ms), 1) if ms else 0.0,
+        'p50_ms': round(percentile(ms, 50), 1),
+        'p95_ms': round(percentile(ms, 95), 1),
+        'p99_ms': round(percentile(ms, 99), 1),
+        'max_ms': round(max(ms), 1) if ms else 0.0,
+    }
+
+
+def configure_environment(args, data_dir: str):
+    """Settings for the app under test; must run before anything from ``app`` is imported"""
+    env = {
+        'LLM_PROVIDER': 'fake',
+        'LLM_FAKE_LATENCY': str(args.llm_latency),
+        'LLM_FAKE_JITTER': str(args.llm_jitter),
+        'LLM_FAKE_ERROR_RATE': str(args.llm_error_rate),
+        'CACHE_REDIS_ENABLED': 'false',
+        'RATE_LIMIT_ENABLED': 'false',
+        'SCRAPER_FETCH_MODE': args.fetch_mode,
+        # The HTTP-only run never needs a browser, so it does not launch one
+        'BROWSER_POOL_SIZE': '0' if args.fetch_mode == 'http' else str(args.browser_pool_size),
+        'DATABASE_URL': f"sqlite:///{Path(data_dir) / 'load_test.db'}",
+    }
+    if args.llm_concurrency:
+        env['LLM_MAX_CONCURRENCY'] = str(args.llm_concurrency)
+    if args.parser_executor:
+        env['PARSER_EXECUTOR'] = args.parser_executor
+    os.environ.update(env)
+
+
+async def drive(args, base_url: str) -> dict:
+    import httpx
+
+    from app.main import app
+    from app.services import progress
+    from app.services.ai_analyzer import ai_analyzer
+    from app.services.scraper import fetch_stats
+
+    sites = args.sites or args.requests
+    stage_samples: Dict[str, List[float]] = defaultdict(list)
+
+    def record_stage(name: str, duration: float):
+        stage_samples[name].append(duration)
+
+    latencies: List[float] = []
+    failures: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def analyze(client: httpx.AsyncClient, site: int, measured: bool):
+        payload = {'url': f"{base_url}/site/{site}/", 'deep_scan': args.deep_scan}
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post('/api/v1/analyze', json=payload)
+                body = response.json()
+                error = None if response.status_code == 200 and body.get('success') else (
+                    body.get('error') or body.get('detail') or f"HTTP {response.status_code}"
+                )
+            except Exception as e:
+                error = type(e).__name__
+            elapsed = time.perf_counter() - start
+
+        if measured:
+            latencies.append(elapsed)
+            if error:
+                failures[str(error)[:120]] += 1
+
+    async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+        # Measure a warmed-up instance, as a load balancer would only route to one
+        deadline = time.monotonic() + timeout
+        while True:
+            response = await client.get('/api/v1/ready')
+            if response.status_code == 200:
+                return
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"App not ready: {response.json()['steps']}")
+            await asyncio.sleep(0.05)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url='http://localhost', timeout=None) as client:
+            await wait_ready(client)
+            await asyncio.gather(*(
+                analyze(client, WARMUP_SITE_OFFSET + i, measured=False) for i in range(args.warmup)
+            ))
+
+            fetches_before = dict(fetch_stats)
+            progress.add_stage_listener(record_stage)
+            started = time.perf_counter()
+            try:
+                await asyncio.gather(*(
+                    analyze(client, i % sites, measured=True) for i in range(args.requests)
+                ))
+            finally:
+                wall = time.perf_counter() - started
+                progress.remove_stage_listener(record_stage)
+            llm_stats = ai_analyzer.stats()
+
+    analyses = len(stage_samples.get('navigation', []))
+    groups = {}
+    for group, names in STAGE_GROUPS.items():
+        samples = [d for name in names for d in stage_samples.get(name, [])]
+        total = sum(samples) * 1000
+        groups[group] = {
+            'total_ms': round(total, 1),
+            'per_analysis_ms': round(total / analyses, 1) if analyses else 0.0,
+        }
+    grouped_total = sum(g['total_ms'] for g in groups.values())
+    for group in groups.values():
+        group['share'] = round(group['total_ms'] / grouped_total, 3) if grouped_total else 0.0
+
+    return {
+        'wall_s': round(wall, 3),
+        'requests': len(latencies),
+        'failed': sum(failures.values()),
+        'failures': dict(failures),
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'latency': summarize(latencies),
+        'analyses_run': analyses,
+        'stage_groups': groups,
+        'stages': {name: summarize(samples) for name, samples in sorted(stage_samples.items())},
+        'fetches': {via: fetch_stats[via] - fetches_before.get(via, 0) for via in fetch_stats},
+        'llm': llm_stats,
+    }
+
+
+def run(args) -> dict:
+    data_dir = tempfile.mkdtemp(prefix='ethics-load-')
+    configure_environment(args, data_dir)
+
+    context = multiprocessing.get_context('spawn')
+    port_queue = context.Queue()
+    server = context.Process(target=serve_fixtures, args=(str(args.corpus), port_queue), daemon=True)
+    server.start()
+    try:
+        base_url = f"http://127.0.0.1:{port_queue.get(timeout=30)}"
+        with RSSSampler(exclude_pids={server.pid}) as rss:
+            results = asyncio.run(drive(args, base_url))
+    finally:
+        server.terminate()
+        server.join()
+
+    results['peak_rss_mb'] = round(rss.peak / 2**20, 1)
+    results['config'] = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'sites': args.sites or args.requests,
+        'deep_scan': args.deep_scan,
+        'fetch_mode': args.fetch_mode,
+        'browser_pool_size': int(os.environ['BROWSER_POOL_SIZE']),
+        'warmup': args.warmup,
+        'llm_latency': args.llm_latency,
+        'llm_jitter': args.llm_jitter,
+        'llm_error_rate': args.llm_error_rate,
+        'llm_concurrency': int(os.environ.get('LLM_MAX_CONCURRENCY', 0)) or None,
+        'parser_executor': os.environ.get('PARSER_EXECUTOR'),
+        'corpus': str(args.corpus),
+    }
+    return results
+
+
+@contextmanager
+def stdout_to_stderr():
+    """Keep stdout for the JSON report; the app and its worker processes may print"""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+
+
+def print_table(results: dict):
+    config = results['config']
+    latency = results['latency']
+    print(f"{results['requests']} requests, concurrency {config['concurrency']}, "
+          f"{config['sites']} sites, deep_scan={config['deep_scan']}, fake LLM {config['llm_latency']}s, "
+          f"fetch_mode={config['fetch_mode']}")
+    print(f"wall {results['wall_s']}s  throughput {results['throughput_rps']} req/s  "
+          f"failed {results['failed']}  peak RSS {results['peak_rss_mb']} MB")
+    print("pages fetched  " + "  ".join(f"{via} {count}" for via, count in results['fetches'].items()))
+    print(f"latency ms  p50 {latency['p50_ms']}  p95 {latency['p95_ms']}  "
+          f"p99 {latency['p99_ms']}  max {latency['max_ms']}  mean {latency['mean_ms']}")
+
+    print(f"\nper analysis ({results['analyses_run']} run)")
+    print(f"{'stage':<14}{'ms':>10}{'share':>8}")
+    for group, data in results['stage_groups'].items():
+        print(f"{group:<14}{data['per_analysis_ms']:>10.1f}{data['share']:>8.1%}")
+
+    print(f"\n{'stage':<22}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name, data in results['stages'].items():
+        print(f"{name:<22}{data['count']:>7}{data['mean_ms']:>9.1f}{data['p50_ms']:>9.1f}"
+              f"{data['p95_ms']:>9.1f}{data['p99_ms']:>9.1f}")
+
+    for error, count in results['failures'].items():
+        print(f"failed x{count}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--sites', type=int, default=0, help="distinct sites (default: one per request)")
+    parser.add_argument('--deep-scan', action='store_true')
+    parser.add_argument('--fetch-mode', choices=('http', 'auto', 'browser'), default='http',
+                        help="SCRAPER_FETCH_MODE; auto and browser launch Chromium")
+    parser.add_argument('--browser-pool-size', type=int, default=2, help="browsers for auto and browser modes")
+    parser.add_argument('--warmup', type=int, default=5, help="unmeasured requests before the run")
+    parser.add_argument('--llm-latency', type=float, default=1.0, help="fake LLM latency in seconds")
+    parser.add_argument('--llm-jitter', type=float, default=0.5)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--llm-concurrency', type=int, default=0, help="override LLM_MAX_CONCURRENCY")
+    parser.add_argument('--parser-executor', choices=('process', 'thread', 'inline'))
+    parser.add_argument('--corpus', type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    parser.add_argument('--output', type=Path, help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    if args.json:
+        with stdout_to_stderr():
+            results = run(args)
+    else:
+        results = run(args)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,84 @@
-export async function analyzeStartupAPI(url) {
-    const response = await fetch('https://ethics-36kr.onrender.com/api/v1/analyze', {
+const API_BASE_URL = 'https://ethics-36kr.onrender.com/api/v1';
+
+// Eventos de progreso que emite el backend mientras corre un análisis
+const PROGRESS_EVENTS = [
+    'queued', 'running', 'cache_hit', 'navigation_started', 'navigation_completed',
+    'main_page_parsed', 'deep_scan_page_fetched', 'prescreen_completed', 'llm_skipped',
+    'llm_request_sent', 'llm_response_received', 'result_structured'
+];
+
+const POLL_INTERVAL_MS = 2000;
+// Tiempo durante el cual un 404 al consultar un análisis en cola se considera transitorio
+const NOT_FOUND_GRACE_MS = 30000;
+
+export async function analyzeStartupAPI(url, onProgress) {
+    const response = await fetch(`${API_BASE_URL}/analyze`, {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ url: url, deep_scan: false })
+        body: JSON.stringify({ url: url, deep_scan: false, background: true })
     });
 
-    if (response.ok) {
-        return await response.json();
+    if (!response.ok) {
+        throw await buildError(response);
+    }
+
+    const job = await response.json();
+    if (!job.success || job.data) {
+        return job;
+    }
+
+    // El análisis quedó en cola: seguimos su progreso y luego pedimos el resultado
+    await followProgress(job.analysis_id, onProgress);
+    return await fetchAnalysis(job.analysis_id);
+}
+
+function followProgress(analysisId, onProgress) {
+    return new Promise((resolve) => {
+        const source = new EventSource(`${API_BASE_URL}/analysis/${analysisId}/events`);
+        const finish = () => {
+            source.close();
+            resolve();
+        };
+
+        PROGRESS_EVENTS.forEach(name => {
+            source.addEventListener(name, (event) => {
+                if (onProgress) {
+                    onProgress(JSON.parse(event.data));
+                }
+            });
+        });
+        source.addEventListener('done', finish);
+        source.addEventListener('failed', finish);
+        // Si se corta el stream, fetchAnalysis sigue consultando el estado
+        source.onerror = finish;
+    });
+}
+
+async function fetchAnalysis(analysisId) {
+    let lastFoundAt = Date.now();
+    while (true) {
+        const response = await fetch(`${API_BASE_URL}/analysis/${analysisId}`);
+        // Otro worker del servidor puede no conocer aún el análisis: reintentamos un tiempo antes de fallar
+        if (response.status === 404 && Date.now() - lastFoundAt < NOT_FOUND_GRACE_MS) {
+            await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
+            continue;
+        }
+        if (!response.ok) {
+            throw await buildError(response);
+        }
+        lastFoundAt = Date.now();
+
+        const result = await response.json();
+        if (result.status !== 'queued' && result.status !== 'running') {
+            return result;
+        }
+        await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS));
     }
+}
 
+async function buildError(response) {
     // Manejar errores de forma más robusta
     let errorDetail = 'No se pudo obtener el detalle del error del servidor.';
     try {
@@ -25,5 +93,5 @@ export async function analyzeStartupAPI(url) {
         errorDetail = 'La respuesta de error del servidor no estaba en formato JSON.';
     }
 
-    throw new Error(`El servidor respondió con un error ${response.status}. Detalles: ${errorDetail}`);
-} 
\ No newline at end of file
+    return new Error(`El servidor respondió con un error ${response.status}. Detalles: ${errorDetail}`);
+}
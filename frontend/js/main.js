@@ -4,7 +4,7 @@
 // Nota: Para que los imports/exports funcionen, el script en index.html
 // debe ser cargado con type="module".
 import { analyzeStartupAPI } from './api.js';
-import { showLoading, hideLoading, displayResults, displayError } from './ui.js';
+import { showLoading, hideLoading, displayResults, displayError, updateProgress } from './ui.js';
 
 // Hacemos que la función sea accesible globalmente para el `onclick` del HTML.
 window.analyzeStartup = async function() {
@@ -24,7 +24,7 @@ window.analyzeStartup = async function() {
     showLoading();
 
     try {
-        const result = await analyzeStartupAPI(url);
+        const result = await analyzeStartupAPI(url, updateProgress);
         // La API ahora devuelve un objeto con { success, data, error }
         if (result.success) {
             displayResults(result.data);
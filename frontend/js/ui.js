@@ -4,6 +4,52 @@ export function showLoading() {
     document.querySelector('.results').style.display = 'none';
     document.querySelector('.loading').style.display = 'block';
     document.getElementById('analyze-btn').disabled = true;
+
+    // Reiniciar los pasos de un análisis anterior
+    document.querySelector('.loading-text').textContent = 'Analizando startup...';
+    for (let i = 2; i <= 4; i++) {
+        const step = document.getElementById(`step${i}`);
+        if (step) {
+            step.style.opacity = 0.5;
+            step.textContent = step.textContent.replace('✓', '⏳');
+        }
+    }
+}
+
+// Texto y paso de la animación de carga para cada evento de progreso
+const PROGRESS_STEPS = {
+    queued: { text: 'En cola para análisis...', step: 0 },
+    running: { text: 'Iniciando análisis...', step: 0 },
+    cache_hit: { text: 'Recuperando análisis previo...', step: 4 },
+    navigation_started: { text: 'Cargando sitio web...', step: 1 },
+    main_page_parsed: { text: 'Página principal procesada', step: 1 },
+    deep_scan_page_fetched: { text: 'Revisando términos y políticas...', step: 2 },
+    prescreen_completed: { text: 'Análisis preliminar listo, consultando IA...', step: 2 },
+    llm_skipped: { text: 'Patrones de riesgo evidentes detectados', step: 4 },
+    llm_request_sent: { text: 'Detectando patrones anti-éticos...', step: 3 },
+    llm_response_received: { text: 'Evaluando impacto social...', step: 4 },
+    result_structured: { text: 'Preparando resultados...', step: 4 }
+};
+
+export function updateProgress(event) {
+    const progressStep = PROGRESS_STEPS[event.event];
+    if (!progressStep) {
+        return;
+    }
+
+    // Los eventos retransmitidos desde otro worker no traen elapsed_ms
+    const elapsed = typeof event.elapsed_ms === 'number'
+        ? ` (${(event.elapsed_ms / 1000).toFixed(1)}s)`
+        : '';
+    document.querySelector('.loading-text').textContent = `${progressStep.text}${elapsed}`;
+
+    for (let i = 1; i <= 4; i++) {
+        const step = document.getElementById(`step${i}`);
+        if (step && i <= progressStep.step) {
+            step.style.opacity = 1;
+            step.textContent = step.textContent.replace('⏳', '✓');
+        }
+    }
 }
 
 export function hideLoading() {
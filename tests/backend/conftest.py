@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import the API package the same way the server runs it, from backend/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
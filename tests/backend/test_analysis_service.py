@@ -0,0 +1,72 @@
+import asyncio
+
+from app.config import settings
+from app.database import connection
+from app.services import analysis_service
+from app.services.analysis_service import analysis_cache_key, analyze_url
+from app.services.analysis_store import analysis_store
+from app.services.cache import CacheService
+
+AI_ANALYSIS = {
+    "overall_score": 70,
+    "category": "warning",
+    "title": "Example",
+    "justification": "Test analysis",
+    "criteria_scores": {"privacy": 7, "social_impact": 7, "transparency": 7, "fairness": 7},
+    "pages_analyzed": 1,
+    "content_length": 100,
+    "ai_confidence": 0.8,
+}
+
+
+class RedirectingScraper:
+    """Scraper whose every page ends up on a fixed URL"""
+
+    def __init__(self, final_url: str):
+        self.final_url = final_url
+        self.scrapes = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def scrape_website(self, url: str, deep_scan: bool = False):
+        self.scrapes += 1
+        return {"url": url, "final_url": self.final_url, "content": "text"}
+
+
+def test_store_fallback_finds_analyses_of_redirected_urls(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'store.db'}")
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", False)
+    scraper = RedirectingScraper("https://example.com/home")
+    monkeypatch.setattr(analysis_service, "create_scraper", lambda: scraper)
+
+    async def analyze_ethics(scraped_data, deep_scan):
+        return dict(AI_ANALYSIS)
+
+    monkeypatch.setattr(analysis_service.ai_analyzer, "analyze_ethics", analyze_ethics)
+
+    async def scenario():
+        await connection.init_db()
+        try:
+            first, reused = await analyze_url("http://example.com/")
+            assert not reused
+            assert first.canonical_url == "https://example.com/home"
+            await analysis_store.flush()
+
+            # The cached analyses expire, the remembered redirect does not
+            for url in ("http://example.com/", "https://example.com/home"):
+                await CacheService.delete(analysis_cache_key(url, False))
+            analysis_store._recent.clear()
+
+            again, reused = await analyze_url("http://example.com/")
+            assert reused
+            assert again.id == first.id
+            assert scraper.scrapes == 1
+        finally:
+            CacheService._local.clear()
+            await connection.close_db()
+
+    asyncio.run(scenario())
@@ -0,0 +1,107 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import connection
+from app.models.analysis import AnalysisResult, CriteriaScore, EthicsCategory
+from app.models.database import AnalysisRecord
+from app.services.analysis_store import AnalysisStore
+
+
+def make_result(url: str = "https://example.com") -> AnalysisResult:
+    return AnalysisResult(
+        id=str(uuid.uuid4()),
+        url=url,
+        canonical_url=url,
+        timestamp=datetime.utcnow(),
+        overall_score=80,
+        category=EthicsCategory.ETHICAL,
+        title="Example",
+        justification="Test result",
+        criteria_scores=CriteriaScore(privacy=8, social_impact=8, transparency=8, fairness=8),
+        analysis_time=1.0,
+        pages_analyzed=1,
+        content_length=100,
+        ai_confidence=0.9,
+    )
+
+
+async def stored_count() -> int:
+    async with connection.get_session() as session:
+        return await session.scalar(select(func.count()).select_from(AnalysisRecord))
+
+
+def run_with_db(tmp_path, monkeypatch, scenario):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'store.db'}")
+
+    async def wrapper():
+        await connection.init_db()
+        try:
+            await scenario()
+        finally:
+            await connection.close_db()
+
+    asyncio.run(wrapper())
+
+
+def test_stop_waits_for_a_flush_in_progress(tmp_path, monkeypatch):
+    async def scenario():
+        store = AnalysisStore(batch_size=3, flush_interval=60, recent_size=10)
+        insert = store._insert
+
+        async def slow_insert(rows):
+            await asyncio.sleep(0.2)
+            await insert(rows)
+
+        store._insert = slow_insert
+        store.start()
+        for _ in range(3):
+            store.save(make_result())
+        await asyncio.sleep(0.05)  # the batch is now being written
+
+        await store.stop()
+
+        assert await stored_count() == 3
+        assert store.stats()["pending"] == 0
+
+    run_with_db(tmp_path, monkeypatch, scenario)
+
+
+def test_rejected_row_is_dropped_without_holding_back_the_batch(tmp_path, monkeypatch):
+    async def scenario():
+        store = AnalysisStore(batch_size=10, flush_interval=60, recent_size=10)
+        duplicate = make_result()
+        store.save(duplicate)
+        await store.flush()
+
+        # The same id again violates the primary key and fails the multi-row INSERT
+        store.save(duplicate)
+        store.save(make_result())
+        store.save(make_result())
+        await store.flush()
+
+        assert await stored_count() == 3
+        stats = store.stats()
+        assert stats["pending"] == 0
+        assert stats["dropped"] == 1
+        assert stats["flush_errors"] == 1
+
+    run_with_db(tmp_path, monkeypatch, scenario)
+
+
+def test_lookups_read_back_flushed_results(tmp_path, monkeypatch):
+    async def scenario():
+        store = AnalysisStore(batch_size=10, flush_interval=60, recent_size=0)
+        result = make_result("https://example.com/about")
+        store.save(result)
+        await store.flush()
+
+        assert (await store.get(result.id)).id == result.id
+        found = await store.find_recent("https://example.com/about", deep_scan=False, max_age=60)
+        assert found.id == result.id
+        assert await store.find_recent("https://other.example", deep_scan=False, max_age=60) is None
+
+    run_with_db(tmp_path, monkeypatch, scenario)
@@ -1 +1,99 @@
-# ... existing code ... 
\ No newline at end of file
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.ai_analyzer import DEGRADED_PATTERN, AIAnalyzer
+from app.services.cache import CacheService
+from app.services.llm_providers import FakeProvider
+
+SCRAPED = {
+    "url": "https://x.ai",
+    "title": "X",
+    "content": "We build assistants for lawyers. Documents are processed in the EU and deleted after 30 days.",
+    "pages_analyzed": 1,
+    "content_length": 95,
+}
+
+
+class CountingProvider(FakeProvider):
+    def __init__(self, **kwargs):
+        super().__init__(latency=0, jitter=0, **kwargs)
+        self.calls = 0
+
+    async def generate(self, prompt, model):
+        self.calls += 1
+        return await super().generate(prompt, model)
+
+
+@pytest.fixture(autouse=True)
+def local_only(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "ETHICS_ENGINE_SKIP_LLM", False)
+    CacheService._local.clear()
+    yield
+    CacheService._local.clear()
+
+
+def analyzer_with(provider) -> AIAnalyzer:
+    analyzer = AIAnalyzer()
+    analyzer.start(provider)
+    return analyzer
+
+
+def test_identical_content_reuses_the_llm_response_whatever_the_url():
+    provider = CountingProvider()
+    analyzer = analyzer_with(provider)
+
+    async def scenario():
+        first = await analyzer.analyze_ethics(SCRAPED)
+        second = await analyzer.analyze_ethics({**SCRAPED, "url": "https://www.x.ai/?utm_source=tw"})
+        assert provider.calls == 1
+        assert first["overall_score"] == second["overall_score"]
+        assert DEGRADED_PATTERN not in first["detected_patterns"]
+
+    asyncio.run(scenario())
+
+
+def test_responses_that_do_not_structure_are_not_cached():
+    provider = CountingProvider(error_rate=1, error_kind="invalid_json")
+    analyzer = analyzer_with(provider)
+
+    async def scenario():
+        for _ in range(2):
+            result = await analyzer.analyze_ethics(SCRAPED)
+            assert DEGRADED_PATTERN in result["detected_patterns"]
+        assert provider.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_open_circuit_falls_back_without_calling_the_provider():
+    provider = CountingProvider()
+    analyzer = analyzer_with(provider)
+    for _ in range(analyzer.breaker.failure_threshold):
+        analyzer.breaker.record_failure()
+
+    async def scenario():
+        result = await analyzer.analyze_ethics(SCRAPED)
+        assert DEGRADED_PATTERN in result["detected_patterns"]
+        assert provider.calls == 0
+        assert analyzer.short_circuited == 1
+
+    asyncio.run(scenario())
+
+
+def test_provider_outage_trips_the_breaker(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 0)
+    provider = CountingProvider(error_rate=1, error_kind="unavailable")
+    analyzer = analyzer_with(provider)
+
+    async def scenario():
+        for _ in range(analyzer.breaker.failure_threshold + 2):
+            result = await analyzer.analyze_ethics({**SCRAPED, "content": f"{SCRAPED['content']} {provider.calls}"})
+            assert DEGRADED_PATTERN in result["detected_patterns"]
+        assert provider.calls == analyzer.breaker.failure_threshold
+        assert analyzer.stats()["circuit"] == "open"
+
+    asyncio.run(scenario())
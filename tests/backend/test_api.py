@@ -1 +1,83 @@
-# ... existing code ... 
\ No newline at end of file
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, HttpUrl
+
+from app.api import rate_limit
+from app.api.rate_limit import RateLimitExceeded, RateLimitMiddleware, acquire_item
+from app.config import settings
+from app.services.rate_limiter import RateLimiter
+
+
+class Payload(BaseModel):
+    url: HttpUrl
+
+
+def limited_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware)
+
+    @app.post("/api/v1/analyze")
+    async def analyze(payload: Payload, request: Request):
+        return {"remaining": rate_limit.remaining(request)}
+
+    @app.post("/api/v1/other")
+    async def other():
+        return {}
+
+    return app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "rate_limiter", RateLimiter(per_minute=1, burst=2, distributed=False))
+    return TestClient(limited_app())
+
+
+def test_requests_over_the_burst_get_429_with_headers(client):
+    for remaining in (1, 0):
+        response = client.post("/api/v1/analyze", json={"url": "https://x.ai"})
+        assert response.status_code == 200
+        assert response.json()["remaining"] == remaining
+        assert response.headers["X-RateLimit-Limit"] == "2"
+
+    response = client.post("/api/v1/analyze", json={"url": "https://x.ai"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+
+
+def test_invalid_requests_get_their_token_back(client):
+    for _ in range(5):
+        response = client.post("/api/v1/analyze", json={"url": "not a url"})
+        assert response.status_code == 422
+    assert client.post("/api/v1/analyze", json={"url": "https://x.ai"}).status_code == 200
+
+
+def test_other_paths_are_not_limited(client):
+    for _ in range(5):
+        assert client.post("/api/v1/other").status_code == 200
+
+
+class FakeRequest:
+    def __init__(self, decision):
+        self.state = type("State", (), {"rate_limit": decision, "rate_limit_key": "ip:1"})()
+
+
+def test_batch_items_wait_for_tokens_then_give_up(monkeypatch):
+    bucket = RateLimiter(per_minute=600, burst=1, distributed=False)
+    monkeypatch.setattr(rate_limit, "rate_limiter", bucket)
+
+    async def scenario():
+        request = FakeRequest(await bucket.acquire("ip:1"))
+        # Retry-After is whole seconds, so the next item waits one second
+        await acquire_item(request, max_wait=2)
+        assert request.state.rate_limit.allowed
+
+        with pytest.raises(RateLimitExceeded):
+            await acquire_item(request, max_wait=0)
+
+    asyncio.run(scenario())
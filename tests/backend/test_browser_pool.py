@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+from app.services import browser_pool as pool_module
+from app.services.browser_pool import BrowserPool, PooledBrowser
+
+
+class FakeContext:
+    def on(self, event, handler):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.launches = 0
+
+    async def launch(self, **kwargs):
+        self.launches += 1
+        await asyncio.sleep(self.delay)
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    def __init__(self, delay=0.0):
+        self.chromium = FakeChromium(delay)
+
+    async def stop(self):
+        pass
+
+
+async def started_pool(size=2, launch_delay=0.0, max_memory_mb=0) -> BrowserPool:
+    pool = BrowserPool(size=size, contexts_per_browser=2, max_pages=0, max_memory_mb=max_memory_mb)
+    pool.playwright = FakePlaywright(launch_delay)
+    pool._slots = asyncio.Semaphore(pool.capacity)
+    pool.browsers = [PooledBrowser(FakeBrowser()) for _ in range(size)]
+    return pool
+
+
+async def hold_lease(pool: BrowserPool, seconds: float) -> float:
+    """Lease a context for a while; returns how long the lease took to get"""
+    started = time.perf_counter()
+    async with pool.lease():
+        waited = time.perf_counter() - started
+        await asyncio.sleep(seconds)
+    return waited
+
+
+def test_lease_replaces_browsers_that_crashed_while_idle():
+    async def scenario():
+        pool = await started_pool(size=2)
+        for pooled in pool.browsers:
+            pooled.browser.connected = False
+
+        await asyncio.wait_for(hold_lease(pool, 0), timeout=2)
+
+        assert pool.playwright.chromium.launches == 1
+        assert len(pool.browsers) == 1
+        assert all(b.browser.is_connected() for b in pool.browsers)
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_leases_share_one_replacement_launch():
+    async def scenario():
+        pool = await started_pool(size=2, launch_delay=0.1)
+        for pooled in pool.browsers:
+            pooled.retiring = True
+
+        await asyncio.gather(*(hold_lease(pool, 0.01) for _ in range(3)))
+
+        assert pool.playwright.chromium.launches == 1
+
+    asyncio.run(scenario())
+
+
+def test_memory_probe_does_not_block_other_leases(monkeypatch):
+    async def slow_memory(self):
+        await asyncio.sleep(0.5)
+        return 10_000
+
+    monkeypatch.setattr(pool_module.PooledBrowser, 'memory_mb', slow_memory)
+
+    async def scenario():
+        pool = await started_pool(size=2, launch_delay=0.5, max_memory_mb=100)
+        first = asyncio.create_task(hold_lease(pool, 0.05))
+        await asyncio.sleep(0.1)  # the first lease is now probing memory on release
+
+        waits = await asyncio.gather(*(hold_lease(pool, 0) for _ in range(3)))
+        assert max(waits) < 0.2
+        await first
+
+    asyncio.run(scenario())
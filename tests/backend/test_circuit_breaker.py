@@ -0,0 +1,74 @@
+from app.utils import circuit_breaker as circuit_breaker_module
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def breaker(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module.time, "monotonic", clock)
+    return CircuitBreaker("test", **kwargs), clock
+
+
+def test_opens_after_consecutive_failures(monkeypatch):
+    circuit, _ = breaker(monkeypatch, failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        circuit.record_failure()
+    assert circuit.state == CircuitBreaker.CLOSED and circuit.allow()
+
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN
+    assert not circuit.allow()
+    assert circuit.trips == 1
+
+
+def test_success_resets_the_failure_count(monkeypatch):
+    circuit, _ = breaker(monkeypatch, failure_threshold=2, reset_timeout=30)
+    circuit.record_failure()
+    circuit.record_success()
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_trial_through(monkeypatch):
+    circuit, clock = breaker(monkeypatch, failure_threshold=1, reset_timeout=30)
+    circuit.record_failure()
+
+    clock.now += 30
+    assert circuit.state == CircuitBreaker.HALF_OPEN
+    assert circuit.allow()
+    assert not circuit.allow()
+
+    circuit.record_success()
+    assert circuit.state == CircuitBreaker.CLOSED
+    assert circuit.allow()
+
+
+def test_failed_trial_reopens_for_another_timeout(monkeypatch):
+    circuit, clock = breaker(monkeypatch, failure_threshold=1, reset_timeout=30)
+    circuit.record_failure()
+    clock.now += 30
+    assert circuit.allow()
+
+    circuit.record_failure()
+    assert circuit.state == CircuitBreaker.OPEN
+    assert circuit.trips == 2
+    clock.now += 29
+    assert not circuit.allow()
+
+
+def test_abandoned_trial_is_given_up_after_the_timeout(monkeypatch):
+    circuit, clock = breaker(monkeypatch, failure_threshold=1, reset_timeout=30)
+    circuit.record_failure()
+    clock.now += 30
+    assert circuit.allow()
+
+    # The trial never reported back
+    clock.now += 30
+    assert circuit.allow()
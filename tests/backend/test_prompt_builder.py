@@ -0,0 +1,68 @@
+from app.services.prompt_builder import PromptBuilder, estimate_tokens
+
+FILLER = "Our team ships new product features every single week for customers"
+RELEVANT = "We sell your personal data to third parties for advertising purposes."
+
+
+def test_prompt_stays_within_the_token_budget():
+    builder = PromptBuilder(token_budget=300)
+    scraped = {
+        "url": "https://x.ai",
+        "title": "X",
+        "content": " ".join(f"{FILLER} number {i}." for i in range(200)),
+    }
+    assert estimate_tokens(builder.build(scraped)) <= 300 + 10
+
+
+def test_relevant_passages_win_over_filler_when_the_budget_is_tight():
+    builder = PromptBuilder(token_budget=200)
+    filler = " ".join(f"{FILLER} number {i}." for i in range(60))
+    scraped = {"url": "https://x.ai", "title": "X", "content": f"{filler} {RELEVANT}"}
+
+    prompt = builder.build(scraped)
+
+    assert RELEVANT in prompt
+    # The opening of the main page is always kept
+    assert f"{FILLER} number 0." in prompt
+
+
+def test_boilerplate_repeated_across_pages_is_sent_once():
+    builder = PromptBuilder(token_budget=2000)
+    footer = "Copyright Example Inc, all rights reserved worldwide."
+    scraped = {
+        "url": "https://x.ai",
+        "title": "X",
+        "content": f"Main page about the product. {footer}",
+        "additional_content": {"privacy_policy": f"{RELEVANT} {footer}"},
+    }
+
+    prompt = builder.build(scraped)
+
+    assert prompt.count(footer) == 1
+    assert "Privacy Policy: " in prompt
+    assert prompt.index("Main content:") < prompt.index("Privacy Policy:")
+
+
+def test_small_pages_are_sent_whole():
+    builder = PromptBuilder(token_budget=2000)
+    content = "We build assistants for lawyers. Documents stay in the EU. Contact us for a demo today."
+    prompt = builder.build({"url": "https://x.ai", "title": "X", "content": content})
+    assert f"Main content: {content}" in prompt
+
+
+def test_metadata_is_trimmed_to_its_share():
+    builder = PromptBuilder(token_budget=200)
+    links = [{"text": f"Link {i}", "href": f"https://x.ai/page/{i}"} for i in range(50)]
+    scraped = {
+        "url": "https://x.ai",
+        "title": "X",
+        "content": "Short page.",
+        "metadata": {"description": "An AI product", "viewport": "width=device-width", "important_links": links},
+    }
+
+    prompt = builder.build(scraped)
+    metadata = prompt.split("Metadata: ", 1)[1]
+
+    assert '"description":"An AI product"' in metadata
+    assert "viewport" not in metadata
+    assert estimate_tokens(metadata) <= 20
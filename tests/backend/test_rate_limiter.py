@@ -0,0 +1,90 @@
+import asyncio
+
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def limiter(monkeypatch, **kwargs) -> RateLimiter:
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", clock)
+    created = RateLimiter(distributed=False, **kwargs)
+    created.clock = clock
+    return created
+
+
+def test_burst_then_reject_with_retry_after(monkeypatch):
+    bucket = limiter(monkeypatch, per_minute=60, burst=3)
+
+    async def scenario():
+        decisions = [await bucket.acquire("ip:1") for _ in range(4)]
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert decisions[2].remaining == 0
+        assert decisions[3].retry_after == 1
+        assert decisions[3].headers()["Retry-After"] == "1"
+        assert bucket.rejected == 1
+
+    asyncio.run(scenario())
+
+
+def test_tokens_refill_at_the_configured_rate(monkeypatch):
+    bucket = limiter(monkeypatch, per_minute=60, burst=2)
+
+    async def scenario():
+        await bucket.acquire("ip:1")
+        await bucket.acquire("ip:1")
+        assert not (await bucket.acquire("ip:1")).allowed
+
+        bucket.clock.now += 1
+        assert (await bucket.acquire("ip:1")).allowed
+        assert not (await bucket.acquire("ip:1")).allowed
+
+        # Never more than the burst, however long the client was idle
+        bucket.clock.now += 3600
+        decision = await bucket.acquire("ip:1")
+        assert decision.remaining == 1
+
+    asyncio.run(scenario())
+
+
+def test_clients_have_separate_buckets(monkeypatch):
+    bucket = limiter(monkeypatch, per_minute=60, burst=1)
+
+    async def scenario():
+        assert (await bucket.acquire("ip:1")).allowed
+        assert not (await bucket.acquire("ip:1")).allowed
+        assert (await bucket.acquire("ip:2")).allowed
+
+    asyncio.run(scenario())
+
+
+def test_refund_gives_tokens_back_up_to_capacity(monkeypatch):
+    bucket = limiter(monkeypatch, per_minute=60, burst=2)
+
+    async def scenario():
+        await bucket.acquire("ip:1")
+        await bucket.acquire("ip:1")
+        assert (await bucket.refund("ip:1", 1)).remaining == 1
+        assert (await bucket.refund("ip:1", 5)).remaining == 2
+
+    asyncio.run(scenario())
+
+
+def test_least_recent_clients_are_forgotten(monkeypatch):
+    bucket = limiter(monkeypatch, per_minute=60, burst=1, max_clients=2)
+
+    async def scenario():
+        for client in ("ip:1", "ip:2", "ip:3"):
+            await bucket.acquire(client)
+        # ip:1 was evicted, so it starts again with a full bucket
+        assert (await bucket.acquire("ip:1")).allowed
+        assert not (await bucket.acquire("ip:3")).allowed
+
+    asyncio.run(scenario())
@@ -1 +1,161 @@
-# ... existing code ... 
\ No newline at end of file
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import scraper as scraper_module
+from app.services.request_blocking import RequestBlocker
+from app.services.scraper import WebScraper
+
+
+class FakeRoute:
+    def __init__(self, url, resource_type="document"):
+        self.request = type("Request", (), {"url": url, "resource_type": resource_type})()
+        self.outcome = None
+
+    async def abort(self, reason):
+        self.outcome = f"abort:{reason}"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+class FakePage:
+    def __init__(self, html=""):
+        self.html = html
+        self.url = "https://x.ai/"
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        return None
+
+    async def wait_for_load_state(self, *args, **kwargs):
+        pass
+
+    async def content(self):
+        return self.html
+
+    async def title(self):
+        return "X"
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeFrame:
+    def __init__(self, page, parent=None):
+        self.page = page
+        self.parent_frame = parent
+
+
+class FakeResponse:
+    def __init__(self, frame, length, navigation=True):
+        self.headers = {"content-length": str(length)} if length is not None else {}
+        self.request = type("Request", (), {
+            "url": "https://x.ai/",
+            "frame": frame,
+            "is_navigation_request": lambda self: navigation,
+        })()
+
+
+def test_blocker_aborts_heavy_resources_and_trackers():
+    blocker = RequestBlocker(resource_types=["image"], tracker_domains=["tracker.com"], max_bytes=None)
+
+    async def scenario():
+        routes = [
+            FakeRoute("https://x.ai/logo.png", "image"),
+            FakeRoute("https://cdn.tracker.com/t.js", "script"),
+            FakeRoute("https://nottracker.com/app.js", "script"),
+            FakeRoute("https://x.ai/", "document"),
+        ]
+        for route in routes:
+            await blocker.handle(route)
+        assert [route.outcome for route in routes] == [
+            "abort:blockedbyclient", "abort:blockedbyclient", "continue", "continue",
+        ]
+        assert blocker.blocked == 2
+
+    asyncio.run(scenario())
+
+
+def test_blocker_closes_only_oversized_main_frame_navigations():
+    blocker = RequestBlocker(resource_types=[], tracker_domains=[], max_bytes=1000)
+
+    async def scenario():
+        main, iframe, small, undeclared = FakePage(), FakePage(), FakePage(), FakePage()
+        await blocker._check_size(FakeResponse(FakeFrame(iframe, parent=object()), 5000))
+        await blocker._check_size(FakeResponse(FakeFrame(small), 500))
+        await blocker._check_size(FakeResponse(FakeFrame(undeclared), None))
+        await blocker._check_size(FakeResponse(FakeFrame(main), 5000))
+
+        assert [page.closed for page in (main, iframe, small, undeclared)] == [True, False, False, False]
+        assert blocker.oversized == {main: 5000}
+
+    asyncio.run(scenario())
+
+
+def browser_scraper(html: str) -> WebScraper:
+    scraper = WebScraper(fetch_mode="browser")
+    scraper.max_page_size = 1000
+
+    class Context:
+        async def new_page(self):
+            return FakePage(html)
+
+    scraper.context = Context()
+    return scraper
+
+
+def test_browser_pages_without_a_declared_length_are_still_bounded():
+    async def scenario():
+        html, final_url, title = await browser_scraper("a" * 500)._fetch_browser("https://x.ai", 1000, main=True)
+        assert len(html) == 500
+
+        with pytest.raises(Exception, match="MAX_PAGE_SIZE"):
+            await browser_scraper("a" * 5000)._fetch_browser("https://x.ai", 1000, main=True)
+
+    asyncio.run(scenario())
+
+
+def http_scraper(monkeypatch, handler) -> WebScraper:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(scraper_module, "get_http_client", lambda: client)
+    scraper = WebScraper(fetch_mode="http")
+    scraper.max_page_size = 1000
+    return scraper
+
+
+def test_http_fetch_stops_reading_oversized_chunked_bodies(monkeypatch):
+    async def chunks():
+        for _ in range(100):
+            yield b"a" * 100
+
+    scraper = http_scraper(monkeypatch, lambda request: httpx.Response(
+        200, headers={"content-type": "text/html"}, content=chunks(),
+    ))
+
+    async def scenario():
+        with pytest.raises(Exception, match="MAX_PAGE_SIZE"):
+            await scraper._fetch_http("https://x.ai", 1000)
+
+    asyncio.run(scenario())
+
+
+def test_http_fetch_skips_non_html(monkeypatch):
+    scraper = http_scraper(monkeypatch, lambda request: httpx.Response(
+        200, headers={"content-type": "application/pdf"}, content=b"%PDF",
+    ))
+
+    async def scenario():
+        assert await scraper._fetch_http("https://x.ai/doc.pdf", 1000) is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("html, text, expected", [
+    ("<html><body><p>...</p></body></html>", "x" * 1000, False),
+    ("<html><body><div id=\"root\"></div></body></html>", "", True),
+    ("<noscript>Please enable JavaScript to continue</noscript>", "x" * 1000, True),
+])
+def test_needs_browser_heuristic(html, text, expected):
+    assert WebScraper(fetch_mode="auto")._needs_browser(html, text) is expected
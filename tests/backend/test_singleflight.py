@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight(distributed=False)
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert flight.coalesced == 4
+        assert flight.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight(distributed=False)
+        results = await asyncio.gather(
+            flight.do("a", lambda: asyncio.sleep(0.01, result="a")),
+            flight.do("b", lambda: asyncio.sleep(0.01, result="b")),
+        )
+        assert results == ["a", "b"]
+        assert flight.coalesced == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_work():
+    async def scenario():
+        flight = SingleFlight(distributed=False)
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await follower == "done"
+
+    asyncio.run(scenario())
+
+
+def test_failure_reaches_every_caller_and_the_key_can_run_again():
+    async def scenario():
+        flight = SingleFlight(distributed=False)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        assert await flight.do("key", lambda: asyncio.sleep(0, result="retry")) == "retry"
+
+    asyncio.run(scenario())
+
+
+def test_distributed_mode_runs_locally_without_redis(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", False)
+
+    async def scenario():
+        flight = SingleFlight(distributed=True)
+
+        async def lookup():
+            pytest.fail("lookup needs Redis")
+
+        assert await flight.do("key", lambda: asyncio.sleep(0, result="local"), lookup=lookup) == "local"
+
+    asyncio.run(scenario())
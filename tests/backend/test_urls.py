@@ -0,0 +1,30 @@
+import pytest
+
+from app.utils.urls import canonicalize_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://x.ai",
+    "http://x.ai/",
+    "http://WWW.X.ai:80/?utm_source=tw#top",
+    "https://www.x.ai:443",
+    "https://x.ai/?fbclid=abc&gclid=def",
+    "  https://x.ai.  ",
+])
+def test_variants_of_a_page_share_one_key(url):
+    assert canonicalize_url(url) == "https://x.ai"
+
+
+def test_query_order_is_ignored_but_values_are_kept():
+    assert canonicalize_url("https://x.ai/p?b=2&a=1") == canonicalize_url("https://x.ai/p?a=1&b=2")
+    assert canonicalize_url("https://x.ai/p?a=1") != canonicalize_url("https://x.ai/p?a=2")
+
+
+def test_tracking_prefixes_are_dropped_case_insensitively():
+    assert canonicalize_url("https://x.ai/p?UTM_Campaign=x&mtm_kwd=y&id=3") == "https://x.ai/p?id=3"
+
+
+def test_path_case_and_non_default_ports_are_kept():
+    assert canonicalize_url("https://x.ai/About/") == "https://x.ai/About"
+    assert canonicalize_url("http://x.ai:8080/") == "https://x.ai:8080"
+    assert canonicalize_url("https://x.ai/About") != canonicalize_url("https://x.ai/about")